@@ -78,8 +78,10 @@ class SystemMetrics:
 class EnhancedRecoveryAgent:
     """Enhanced Recovery Agent с интеграцией MCP протокола"""
     
-    def __init__(self, config_path: str = "config/recovery-config.yaml"):
+    def __init__(self, config_path: str = "config/recovery-config.yaml", data_dir: str = "."):
         self.config_path = config_path
+        # Корень для директорий memory/ и sessions/
+        self.data_dir = data_dir
         self.config = self._load_config()
         self.running = False
         self.services: Dict[str, ServiceHealth] = {}
@@ -101,6 +103,9 @@ class EnhancedRecoveryAgent:
         self.available_models: List[Dict[str, Any]] = []
         self.model_health: Dict[str, bool] = {}
         
+        # Устанавливается, когда все подсистемы готовы к работе
+        self._ready = asyncio.Event()
+        
         logger.info("Enhanced Recovery Agent v2.0 initialized with MCP integration, markdown memory system, and session management")
     
     def _load_config(self) -> Dict[str, Any]:
@@ -129,7 +134,7 @@ class EnhancedRecoveryAgent:
             spec.loader.exec_module(memory_module)
             MarkdownMemoryManager = memory_module.MarkdownMemoryManager
             
-            self.memory_manager = MarkdownMemoryManager("memory")
+            self.memory_manager = MarkdownMemoryManager(os.path.join(self.data_dir, "memory"))
             logger.info("✅ Markdown Memory Manager initialized")
         except Exception as e:
             logger.warning(f"⚠️ Failed to initialize memory manager: {e}")
@@ -148,7 +153,7 @@ class EnhancedRecoveryAgent:
             spec.loader.exec_module(session_module)
             SessionManager = session_module.SessionManager
             
-            self.session_manager = SessionManager("sessions", self.memory_manager)
+            self.session_manager = SessionManager(os.path.join(self.data_dir, "sessions"), self.memory_manager)
             logger.info("✅ Session Manager initialized")
         except Exception as e:
             logger.warning(f"⚠️ Failed to initialize session manager: {e}")
@@ -188,12 +193,21 @@ class EnhancedRecoveryAgent:
             else:
                 logger.warning("⚠️ MCP integration not available, using legacy mode")
             
+            # Wait for background session loading instead of racing it
+            if self.session_manager:
+                await self.session_manager.ready()
+            
+            self._ready.set()
             logger.info("🎯 Enhanced Recovery Agent fully initialized")
             
         except Exception as e:
             logger.error(f"Failed to initialize Enhanced Recovery Agent: {e}")
             raise
     
+    async def ready(self):
+        """Ожидание завершения инициализации агента"""
+        await self._ready.wait()
+    
     async def start_monitoring(self):
         """Запуск основного цикла мониторинга"""
         logger.info("🚀 Starting Enhanced Recovery Agent v2.0 monitoring...")
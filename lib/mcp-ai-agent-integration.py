@@ -10,11 +10,16 @@ import json
 import logging
 import time
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Union, Callable
+from typing import Dict, List, Optional, Any, Union, Callable, Tuple
 from dataclasses import dataclass, asdict
 from pathlib import Path
 import yaml
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
@@ -24,7 +29,7 @@ class MCPServerConfig:
     name: str
     url: str
     enabled: bool = True
-    auto_approve: List[str] = None
+    auto_approve: Tuple[str, ...] = ()
     timeout: int = 30
     retry_attempts: int = 3
     retry_delay: int = 5
@@ -81,33 +86,36 @@ class MCPConnectionManager:
     async def load_configuration(self):
         """Load MCP server configuration"""
         try:
-            with open(self.config_path, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-            
-            self.servers.clear()
-            
-            for server_id, server_config in config.get('mcpServers', {}).items():
-                if not server_config.get('disabled', False):
-                    # Determine server URL based on environment variables
-                    port = self._get_server_port(server_id, server_config)
-                    url = f"http://localhost:{port}"
-                    
-                    self.servers[server_id] = MCPServerConfig(
-                        name=server_id,
-                        url=url,
-                        enabled=True,
-                        auto_approve=server_config.get('autoApprove', []),
-                        timeout=30,
-                        retry_attempts=3,
-                        retry_delay=5
-                    )
-            
-            logger.info(f"Loaded configuration for {len(self.servers)} MCP servers")
+            config_data = Path(self.config_path).read_bytes()
+            config = orjson.loads(config_data) if orjson is not None else json.loads(config_data)
+            self.load_configuration_from_dict(config)
             
         except Exception as e:
             logger.error(f"Failed to load MCP configuration: {e}")
             raise
     
+    def load_configuration_from_dict(self, config: Dict[str, Any]):
+        """Load MCP server configuration from an already parsed mapping"""
+        self.servers.clear()
+        
+        for server_id, server_config in config.get('mcpServers', {}).items():
+            if not server_config.get('disabled', False):
+                # Determine server URL based on environment variables
+                port = self._get_server_port(server_id, server_config)
+                url = f"http://localhost:{port}"
+                
+                self.servers[server_id] = MCPServerConfig(
+                    name=server_id,
+                    url=url,
+                    enabled=True,
+                    auto_approve=tuple(server_config.get('autoApprove') or ()),
+                    timeout=30,
+                    retry_attempts=3,
+                    retry_delay=5
+                )
+        
+        logger.info(f"Loaded configuration for {len(self.servers)} MCP servers")
+    
     def _get_server_port(self, server_id: str, config: Dict[str, Any]) -> int:
         """Get server port from configuration"""
         port_mapping = {
@@ -412,7 +420,7 @@ class MCPConnectionManager:
                 'connected': self.connection_status.get(server_id, False),
                 'url': server_config.url,
                 'last_health_check': self.last_health_check.get(server_id),
-                'auto_approve_tools': server_config.auto_approve
+                'auto_approve_tools': list(server_config.auto_approve)
             }
         
         return status
@@ -15,6 +15,7 @@ from pathlib import Path
 from dataclasses import dataclass, asdict
 import hashlib
 import re
+import uuid
 import logging
 
 logger = logging.getLogger(__name__)
@@ -66,7 +67,8 @@ class MarkdownMemoryManager:
         # Конфигурация
         self.config = self._load_config()
         
-        # Загружаем индекс
+        # Загружаем индекс (ready() завершается после загрузки)
+        self._index_loaded = asyncio.Event()
         asyncio.create_task(self._load_index())
         
         logger.info(f"MarkdownMemoryManager initialized with directory: {self.memory_dir}")
@@ -120,6 +122,12 @@ class MarkdownMemoryManager:
         except Exception as e:
             logger.error(f"Failed to load memory index: {e}")
             await self._rebuild_index()
+        finally:
+            self._index_loaded.set()
+    
+    async def ready(self):
+        """Ожидание загрузки индекса памяти"""
+        await self._index_loaded.wait()
     
     async def _save_index(self):
         """Сохранение индекса памяти"""
@@ -324,21 +332,8 @@ class MarkdownMemoryManager:
         """Обновление памяти сущности"""
         try:
             # Создаем новую запись
-            entry_id = hashlib.md5(f"{entity}{content}{datetime.now().isoformat()}".encode()).hexdigest()[:8]
-            
-            if importance is None:
-                importance = self._determine_importance(content, memory_type)
-            
-            entry = MemoryEntry(
-                id=entry_id,
-                entity=entity,
-                content=content,
-                memory_type=memory_type,
-                timestamp=datetime.now(),
-                tags=tags or [],
-                metadata=metadata or {},
-                importance=importance
-            )
+            entry = self._create_entry(entity, content, memory_type, tags, metadata, importance)
+            entry_id = entry.id
             
             # Добавляем запись в файл
             await self._append_entry_to_file(entity, entry)
@@ -361,6 +356,65 @@ class MarkdownMemoryManager:
             logger.error(f"Failed to update memory for {entity}: {e}")
             raise
     
+    async def bulk_update(self, records: List[Dict[str, Any]]) -> List[str]:
+        """Пакетное обновление памяти
+        
+        Каждая запись - словарь с аргументами update_memory. Записи одной
+        сущности дописываются в файл одной операцией, индекс сохраняется один раз.
+        """
+        try:
+            entry_ids = []
+            entries_by_entity: Dict[str, List[MemoryEntry]] = {}
+            
+            for record in records:
+                entry = self._create_entry(
+                    record['entity'],
+                    record['content'],
+                    record.get('memory_type', 'fact'),
+                    record.get('tags'),
+                    record.get('metadata'),
+                    record.get('importance')
+                )
+                entry_ids.append(entry.id)
+                entries_by_entity.setdefault(entry.entity, []).append(entry)
+            
+            for entity, entries in entries_by_entity.items():
+                await self._append_entries_to_file(entity, entries)
+                
+                self.memory_index.setdefault(entity, []).extend(entry.id for entry in entries)
+                await self._update_entity_stats(entity)
+            
+            if entries_by_entity:
+                await self._save_index()
+            
+            logger.debug(f"Bulk memory update: {len(entry_ids)} entries, {len(entries_by_entity)} entities")
+            return entry_ids
+            
+        except Exception as e:
+            logger.error(f"Failed to bulk update memory: {e}")
+            raise
+    
+    def _create_entry(self, entity: str, content: str, memory_type: str = "fact",
+                      tags: List[str] = None, metadata: Dict[str, Any] = None,
+                      importance: int = None) -> MemoryEntry:
+        """Создание записи памяти"""
+        # uuid4 keeps IDs unique within a batch created in the same instant
+        entry_id = hashlib.md5(f"{entity}{content}{datetime.now().isoformat()}{uuid.uuid4()}".encode()).hexdigest()[:8]
+        
+        if importance is None:
+            importance = self._determine_importance(content, memory_type)
+        
+        return MemoryEntry(
+            id=entry_id,
+            entity=entity,
+            content=content,
+            memory_type=memory_type,
+            timestamp=datetime.now(),
+            tags=tags or [],
+            metadata=metadata or {},
+            importance=importance
+        )
+    
     async def _append_entry_to_file(self, entity: str, entry: MemoryEntry):
         """Добавление записи в файл сущности"""
         entity_file = self.entities_dir / f"{entity}.md"
@@ -376,6 +430,19 @@ class MarkdownMemoryManager:
         async with aiofiles.open(entity_file, 'a', encoding='utf-8') as f:
             await f.write(f"\n{markdown_entry}\n")
     
+    async def _append_entries_to_file(self, entity: str, entries: List[MemoryEntry]):
+        """Добавление нескольких записей в файл сущности одной записью"""
+        entity_file = self.entities_dir / f"{entity}.md"
+        
+        # Создаем файл если не существует
+        if not entity_file.exists():
+            await self._create_entity_file(entity)
+        
+        markdown_entries = "".join(f"\n{self._format_entry_as_markdown(entry)}\n" for entry in entries)
+        
+        async with aiofiles.open(entity_file, 'a', encoding='utf-8') as f:
+            await f.write(markdown_entries)
+    
     async def _create_entity_file(self, entity: str):
         """Создание нового файла сущности"""
         entity_file = self.entities_dir / f"{entity}.md"
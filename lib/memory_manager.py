@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+"""
+Import shim for lib/memory-manager.py
+Позволяет импортировать менеджер памяти обычным import (имя файла содержит дефис)
+"""
+
+import importlib.util
+import os
+import sys
+
+# Execute memory-manager.py once and register it under this module's name,
+# so later imports are served from sys.modules
+_spec = importlib.util.spec_from_file_location(
+    __name__,
+    os.path.join(os.path.dirname(__file__), 'memory-manager.py')
+)
+_module = importlib.util.module_from_spec(_spec)
+sys.modules[__name__] = _module
+_spec.loader.exec_module(_module)
@@ -12,13 +12,41 @@ import uuid
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Union
 from pathlib import Path
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 import logging
 import hashlib
 import aiofiles
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+def _dumps(obj: Any) -> bytes:
+    """Сериализация в JSON (orjson при наличии)"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
+def _loads(data: Union[str, bytes]) -> Any:
+    """Десериализация JSON (orjson при наличии)"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _write_json(path: Path, obj: Any):
+    """Атомарная запись JSON: временный файл + os.replace"""
+    tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(_dumps(obj))
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
 @dataclass
 class SessionInfo:
     """Информация о сессии"""
@@ -63,6 +91,10 @@ class ContextEntry:
     content: str
     metadata: Dict[str, Any]
     importance: int = 1  # 1-5
+    preview: str = field(init=False, repr=False, compare=False)  # первые 50 символов content
+    
+    def __post_init__(self):
+        self.preview = self.content[:50]
     
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -112,7 +144,8 @@ class SessionManager:
         # Конфигурация
         self.config = self._load_config()
         
-        # Загружаем активные сессии
+        # Загружаем активные сессии (ready() завершается после загрузки)
+        self._sessions_loaded = asyncio.Event()
         asyncio.create_task(self._load_active_sessions())
         
         logger.info(f"SessionManager initialized with directory: {self.sessions_dir}")
@@ -156,9 +189,14 @@ class SessionManager:
                 try:
                     async with aiofiles.open(session_file, 'r', encoding='utf-8') as f:
                         content = await f.read()
-                        session_data = json.loads(content)
+                        session_data = _loads(content)
                         session_info = SessionInfo.from_dict(session_data)
                         
+                        # Сессия уже создана в этом процессе, пока шла загрузка:
+                        # данные в памяти новее файла, их нельзя перезаписывать
+                        if session_info.session_id in self.active_sessions:
+                            continue
+                        
                         # Проверяем, не истекла ли сессия
                         if self._is_session_expired(session_info):
                             await self._archive_session(session_info.session_id)
@@ -175,9 +213,18 @@ class SessionManager:
             
         except Exception as e:
             logger.error(f"Failed to load active sessions: {e}")
+        finally:
+            self._sessions_loaded.set()
+    
+    async def ready(self):
+        """Ожидание загрузки активных сессий"""
+        await self._sessions_loaded.wait()
     
     async def _load_session_context(self, session_id: str):
-        """Загрузка контекста сессии"""
+        """Загрузка контекста сессии (уже загруженный в память контекст не трогается)"""
+        if session_id in self.session_contexts:
+            return
+        
         context_file = self.context_dir / f"{session_id}.json"
         
         if not context_file.exists():
@@ -187,18 +234,19 @@ class SessionManager:
         try:
             async with aiofiles.open(context_file, 'r', encoding='utf-8') as f:
                 content = await f.read()
-                context_data = json.loads(content)
+                context_data = _loads(content)
                 
                 context_entries = [
                     ContextEntry.from_dict(entry_data)
                     for entry_data in context_data.get('entries', [])
                 ]
                 
-                self.session_contexts[session_id] = context_entries
+                # Контекст мог появиться в памяти, пока читался файл
+                self.session_contexts.setdefault(session_id, context_entries)
                 
         except Exception as e:
             logger.error(f"Failed to load context for session {session_id}: {e}")
-            self.session_contexts[session_id] = []
+            self.session_contexts.setdefault(session_id, [])
     
     def _is_session_expired(self, session_info: SessionInfo) -> bool:
         """Проверка истечения сессии"""
@@ -424,8 +472,7 @@ class SessionManager:
         session_file = self.active_sessions_dir / f"{session_info.session_id}.json"
         
         try:
-            async with aiofiles.open(session_file, 'w', encoding='utf-8') as f:
-                await f.write(json.dumps(session_info.to_dict(), indent=2, ensure_ascii=False))
+            await asyncio.to_thread(_write_json, session_file, session_info.to_dict())
         except Exception as e:
             logger.error(f"Failed to save session {session_info.session_id}: {e}")
     
@@ -443,8 +490,7 @@ class SessionManager:
                 ]
             }
             
-            async with aiofiles.open(context_file, 'w', encoding='utf-8') as f:
-                await f.write(json.dumps(context_data, indent=2, ensure_ascii=False))
+            await asyncio.to_thread(_write_json, context_file, context_data)
                 
         except Exception as e:
             logger.error(f"Failed to save context for session {session_id}: {e}")
@@ -483,8 +529,7 @@ class SessionManager:
                 if active_file.exists():
                     # Обновляем статус и сохраняем в архив
                     session_info.is_active = False
-                    async with aiofiles.open(archived_file, 'w', encoding='utf-8') as f:
-                        await f.write(json.dumps(session_info.to_dict(), indent=2, ensure_ascii=False))
+                    await asyncio.to_thread(_write_json, archived_file, session_info.to_dict())
                     
                     # Удаляем из активных
                     active_file.unlink()
@@ -575,7 +620,7 @@ class SessionManager:
                 if archived_file.exists():
                     async with aiofiles.open(archived_file, 'r', encoding='utf-8') as f:
                         content = await f.read()
-                        session_data = json.loads(content)
+                        session_data = _loads(content)
                         session_info = SessionInfo.from_dict(session_data)
                 else:
                     raise ValueError(f"Session {session_id} not found")
@@ -606,7 +651,7 @@ class SessionManager:
             # Загружаем данные сессии
             async with aiofiles.open(archived_file, 'r', encoding='utf-8') as f:
                 content = await f.read()
-                session_data = json.loads(content)
+                session_data = _loads(content)
                 session_info = SessionInfo.from_dict(session_data)
             
             # Активируем сессию
@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+"""
+Import shim for lib/session-manager.py
+Позволяет импортировать менеджер сессий обычным import (имя файла содержит дефис)
+"""
+
+import importlib.util
+import os
+import sys
+
+# Execute session-manager.py once and register it under this module's name,
+# so later imports are served from sys.modules
+_spec = importlib.util.spec_from_file_location(
+    __name__,
+    os.path.join(os.path.dirname(__file__), 'session-manager.py')
+)
+_module = importlib.util.module_from_spec(_spec)
+sys.modules[__name__] = _module
+_spec.loader.exec_module(_module)
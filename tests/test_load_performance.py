@@ -9,14 +9,19 @@ import sys
 import os
 import json
 import time
-import statistics
+import math
 import concurrent.futures
-import threading
+import bisect
+from array import array
 from pathlib import Path
-from datetime import datetime
 from typing import Dict, List, Any, Optional, Tuple
 import logging
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Add project root to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
@@ -24,42 +29,169 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 logging.basicConfig(level=logging.WARNING)  # Reduce noise during load tests
 logger = logging.getLogger(__name__)
 
+# Performance grades: (grade, min success rate %, max avg response s, max p99 s)
+PERFORMANCE_GRADES: Tuple[Tuple[str, float, float, float], ...] = (
+    ("A+", 99, 0.1, 0.5),
+    ("A", 95, 0.2, 1.0),
+    ("B", 90, 0.5, 2.0),
+    ("C", 80, 1.0, 5.0),
+    ("D", 70, float('inf'), float('inf')),
+)
+
+class LatencyHistogram:
+    """Гистограмма времени отклика с логарифмическими границами (как в Prometheus)
+    
+    Memory is O(number of buckets) regardless of how many observations are
+    recorded, which keeps long soak tests from accumulating huge lists.
+    """
+    def __init__(self, min_bound: float = 5e-6, max_bound: float = 10.0, buckets_per_decade: int = 10,
+                 keep_samples: bool = False):
+        self.bounds: List[float] = []
+        bound = min_bound
+        step = 10 ** (1 / buckets_per_decade)
+        while bound < max_bound:
+            self.bounds.append(bound)
+            bound *= step
+        self.bounds.append(max_bound)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+        # Raw samples are only retained in debugging mode, stored unboxed as C doubles
+        self.keep_samples = keep_samples
+        self.samples = array('d')
+    
+    def observe(self, value: float, count: int = 1):
+        """Регистрация измерения (count одинаковых значений)"""
+        self.counts[bisect.bisect_left(self.bounds, value)] += count
+        self.count += count
+        self.total += value * count
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if self.keep_samples:
+            if count == 1:
+                self.samples.append(value)
+            else:
+                self.samples.extend(array('d', [value]) * count)
+    
+    def merge(self, other: 'LatencyHistogram') -> 'LatencyHistogram':
+        """Слияние с гистограммой с теми же границами"""
+        for index, bucket_count in enumerate(other.counts):
+            self.counts[index] += bucket_count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        if self.keep_samples:
+            self.samples.extend(other.samples)
+        return self
+    
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0
+    
+    def percentile(self, percentile: float) -> float:
+        """Перцентиль с линейной интерполяцией внутри бакета"""
+        if not self.count:
+            return 0
+        rank = (percentile / 100) * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count and cumulative + bucket_count >= rank:
+                lower = self.bounds[index - 1] if index > 0 else self.min
+                upper = self.bounds[index] if index < len(self.bounds) else self.max
+                lower = max(lower, self.min)
+                upper = min(upper, self.max)
+                return lower + (upper - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.max
+
 class LoadTestResult:
     """Результат нагрузочного теста"""
     def __init__(self, test_name: str, total_requests: int, duration: float, 
-                 success_count: int, error_count: int, response_times: List[float]):
+                 success_count: int, error_count: int, response_times: List[float],
+                 histogram: Optional[LatencyHistogram] = None):
         self.test_name = test_name
         self.total_requests = total_requests
         self.duration = duration
         self.success_count = success_count
         self.error_count = error_count
         self.response_times = response_times
-        self.timestamp = datetime.now()
+        self.histogram = histogram
+        self.timestamp = time.time()
         
         # Calculate metrics
         self.success_rate = (success_count / total_requests) * 100 if total_requests > 0 else 0
         self.requests_per_second = total_requests / duration if duration > 0 else 0
-        self.avg_response_time = statistics.mean(response_times) if response_times else 0
-        self.min_response_time = min(response_times) if response_times else 0
-        self.max_response_time = max(response_times) if response_times else 0
-        self.median_response_time = statistics.median(response_times) if response_times else 0
-        self.p95_response_time = self._percentile(response_times, 95) if response_times else 0
-        self.p99_response_time = self._percentile(response_times, 99) if response_times else 0
+        if response_times:
+            # Sort once and read every order statistic from the same list
+            sorted_times = sorted(response_times)
+            count = len(sorted_times)
+            middle = count // 2
+            self.avg_response_time = math.fsum(sorted_times) / count
+            self.min_response_time = sorted_times[0]
+            self.max_response_time = sorted_times[-1]
+            self.median_response_time = (
+                sorted_times[middle] if count % 2 else (sorted_times[middle - 1] + sorted_times[middle]) / 2
+            )
+            self.p95_response_time = self._percentile(sorted_times, 95)
+            self.p99_response_time = self._percentile(sorted_times, 99)
+        elif histogram is not None and histogram.count:
+            self.avg_response_time = histogram.mean
+            self.min_response_time = histogram.min
+            self.max_response_time = histogram.max
+            self.median_response_time = histogram.percentile(50)
+            self.p95_response_time = histogram.percentile(95)
+            self.p99_response_time = histogram.percentile(99)
+        else:
+            self.avg_response_time = 0
+            self.min_response_time = 0
+            self.max_response_time = 0
+            self.median_response_time = 0
+            self.p95_response_time = 0
+            self.p99_response_time = 0
     
-    def _percentile(self, data: List[float], percentile: int) -> float:
-        """Вычисление перцентиля"""
-        if not data:
+    def _percentile(self, sorted_data: List[float], percentile: int) -> float:
+        """Вычисление перцентиля по отсортированным данным"""
+        if not sorted_data:
             return 0
-        sorted_data = sorted(data)
         index = int((percentile / 100) * len(sorted_data))
         return sorted_data[min(index, len(sorted_data) - 1)]
 
+def report_result(result: LoadTestResult, stream=None):
+    """Вывод результата теста одной строкой JSON (NDJSON) для CI"""
+    stream = stream or sys.stdout
+    record = {
+        "test": result.test_name,
+        "requests": result.total_requests,
+        "success": result.success_count,
+        "errors": result.error_count,
+        "success_rate": result.success_rate,
+        "rps": result.requests_per_second,
+        "avg": result.avg_response_time,
+        "p95": result.p95_response_time,
+        "p99": result.p99_response_time,
+        "max": result.max_response_time,
+        "duration": result.duration
+    }
+    if orjson is not None:
+        stream.write(orjson.dumps(record).decode())
+    else:
+        json.dump(record, stream, ensure_ascii=False)
+    stream.write("\n")
+
 class LoadTestSuite:
     """Набор нагрузочных тестов"""
     
-    def __init__(self):
+    def __init__(self, human: bool = False, raw_samples: bool = False):
         self.results: List[LoadTestResult] = []
         self.temp_dirs: List[str] = []
+        self.human = human
+        # Keep raw response times alongside the histograms (debugging only)
+        self.raw_samples = raw_samples
         
     def create_temp_dir(self) -> str:
         """Создание временной директории"""
@@ -81,7 +213,8 @@ class LoadTestSuite:
     async def load_test_agent_commands(self, concurrent_users: int = 10, 
                                      requests_per_user: int = 50) -> LoadTestResult:
         """Нагрузочный тест команд агента"""
-        print(f"🧪 Load Testing Agent Commands ({concurrent_users} users, {requests_per_user} requests each)...")
+        if self.human:
+            print(f"🧪 Load Testing Agent Commands ({concurrent_users} users, {requests_per_user} requests each)...")
         
         try:
             from agents.enhanced_recovery_agent_v2 import EnhancedRecoveryAgent
@@ -120,19 +253,11 @@ class LoadTestSuite:
                     "mcp status"
                 ]
                 
-                # Shared results storage
-                results_lock = threading.Lock()
-                success_count = 0
-                error_count = 0
-                response_times = []
-                
                 async def user_simulation(user_id: int):
                     """Симуляция одного пользователя"""
-                    nonlocal success_count, error_count, response_times
-                    
                     user_success = 0
                     user_errors = 0
-                    user_times = []
+                    user_histogram = LatencyHistogram(keep_samples=self.raw_samples)
                     
                     for i in range(requests_per_user):
                         command = test_commands[i % len(test_commands)]
@@ -144,20 +269,16 @@ class LoadTestSuite:
                             
                             if response:
                                 user_success += 1
-                                user_times.append(duration)
+                                user_histogram.observe(duration)
                             else:
                                 user_errors += 1
                                 
                         except Exception as e:
                             duration = time.time() - start_time
                             user_errors += 1
-                            logger.error(f"User {user_id} command error: {e}")
+                            logger.error("User %s command error: %s", user_id, e)
                     
-                    # Update shared results
-                    with results_lock:
-                        success_count += user_success
-                        error_count += user_errors
-                        response_times.extend(user_times)
+                    return user_success, user_errors, user_histogram
                 
                 # Run concurrent user simulations
                 start_time = time.time()
@@ -167,7 +288,16 @@ class LoadTestSuite:
                     task = asyncio.create_task(user_simulation(user_id))
                     tasks.append(task)
                 
-                await asyncio.gather(*tasks)
+                worker_results = await asyncio.gather(*tasks)
+                
+                # Merge per-worker counters and histograms at the join point
+                success_count = 0
+                error_count = 0
+                histogram = LatencyHistogram(keep_samples=self.raw_samples)
+                for worker_success, worker_errors, worker_histogram in worker_results:
+                    success_count += worker_success
+                    error_count += worker_errors
+                    histogram.merge(worker_histogram)
                 
                 total_duration = time.time() - start_time
                 total_requests = concurrent_users * requests_per_user
@@ -181,15 +311,17 @@ class LoadTestSuite:
                     duration=total_duration,
                     success_count=success_count,
                     error_count=error_count,
-                    response_times=response_times
+                    response_times=histogram.samples,
+                    histogram=histogram
                 )
                 
-                print(f"✅ Agent Commands Load Test completed:")
-                print(f"   Requests: {total_requests}, Success: {success_count}, Errors: {error_count}")
-                print(f"   Success Rate: {result.success_rate:.1f}%")
-                print(f"   RPS: {result.requests_per_second:.2f}")
-                print(f"   Avg Response: {result.avg_response_time:.3f}s")
-                print(f"   P95 Response: {result.p95_response_time:.3f}s")
+                if self.human:
+                    print(f"✅ Agent Commands Load Test completed:")
+                    print(f"   Requests: {total_requests}, Success: {success_count}, Errors: {error_count}")
+                    print(f"   Success Rate: {result.success_rate:.1f}%")
+                    print(f"   RPS: {result.requests_per_second:.2f}")
+                    print(f"   Avg Response: {result.avg_response_time:.3f}s")
+                    print(f"   P95 Response: {result.p95_response_time:.3f}s")
                 
                 return result
                 
@@ -197,7 +329,7 @@ class LoadTestSuite:
                 os.unlink(config_file)
                 
         except Exception as e:
-            print(f"❌ Agent commands load test failed: {e}")
+            print(f"❌ Agent commands load test failed: {e}", file=sys.stderr)
             return LoadTestResult(
                 test_name="Agent Commands Load Test",
                 total_requests=concurrent_users * requests_per_user,
@@ -210,7 +342,8 @@ class LoadTestSuite:
     async def load_test_memory_system(self, concurrent_operations: int = 20,
                                     operations_per_thread: int = 100) -> LoadTestResult:
         """Нагрузочный тест системы памяти"""
-        print(f"🧪 Load Testing Memory System ({concurrent_operations} threads, {operations_per_thread} ops each)...")
+        if self.human:
+            print(f"🧪 Load Testing Memory System ({concurrent_operations} threads, {operations_per_thread} ops each)...")
         
         try:
             # Import memory manager
@@ -227,60 +360,91 @@ class LoadTestSuite:
             temp_dir = self.create_temp_dir()
             memory_manager = MarkdownMemoryManager(temp_dir)
             
-            # Shared results storage
-            results_lock = threading.Lock()
-            success_count = 0
-            error_count = 0
-            response_times = []
+            # All tasks share this one manager. Stats are read through a short
+            # TTL cache, as a real client would, so the test measures the
+            # uncached update path instead of repeated O(N) stats scans.
+            stats_cache: Dict[str, Any] = {"value": None, "timestamp": 0.0}
+            
+            async def cached_stats(ttl: float = 0.25):
+                """Кэшированная статистика памяти"""
+                now = time.monotonic()
+                if stats_cache["value"] is None or now - stats_cache["timestamp"] > ttl:
+                    stats_cache["value"] = await memory_manager.get_memory_stats()
+                    stats_cache["timestamp"] = now
+                return stats_cache["value"]
+            
+            # Updates are buffered per task and written with bulk_update
+            batch_size = 32
             
             async def memory_operations(thread_id: int):
                 """Операции с памятью в отдельном потоке"""
-                nonlocal success_count, error_count, response_times
-                
                 thread_success = 0
                 thread_errors = 0
-                thread_times = []
+                thread_histogram = LatencyHistogram(keep_samples=self.raw_samples)
+                pending_updates = []
+                
+                async def flush_updates():
+                    """Запись накопленных обновлений одним пакетом"""
+                    nonlocal thread_success, thread_errors
+                    if not pending_updates:
+                        return
+                    
+                    batch_count = len(pending_updates)
+                    start_time = time.time()
+                    try:
+                        await memory_manager.bulk_update(pending_updates)
+                        # Amortized cost of a single logical write
+                        duration = (time.time() - start_time) / batch_count
+                        thread_success += batch_count
+                        thread_histogram.observe(duration, batch_count)
+                    except Exception as e:
+                        thread_errors += batch_count
+                        logger.error("Memory bulk update error in thread %s: %s", thread_id, e)
+                    finally:
+                        pending_updates.clear()
                 
                 for i in range(operations_per_thread):
                     operation_type = i % 4  # 4 types of operations
-                    start_time = time.time()
                     
-                    try:
-                        if operation_type == 0:  # Memory update
-                            await memory_manager.update_memory(
-                                entity=f"load_test_entity_{thread_id}_{i}",
-                                content=f"Load test memory entry {thread_id}_{i}",
-                                memory_type="fact",
-                                tags=["load_test", f"thread_{thread_id}"],
-                                importance=2
-                            )
-                        elif operation_type == 1:  # Memory search
-                            await memory_manager.search_memory("load_test", limit=10)
-                        elif operation_type == 2:  # Memory stats
-                            await memory_manager.get_memory_stats()
-                        else:  # Memory update with different entity
-                            await memory_manager.update_memory(
-                                entity=f"shared_entity_{i % 5}",
-                                content=f"Shared memory entry from thread {thread_id}",
-                                memory_type="observation",
-                                tags=["shared", "load_test"],
-                                importance=1
-                            )
-                        
-                        duration = time.time() - start_time
-                        thread_success += 1
-                        thread_times.append(duration)
+                    if operation_type == 0:  # Memory update
+                        pending_updates.append({
+                            "entity": f"load_test_entity_{thread_id}_{i}",
+                            "content": f"Load test memory entry {thread_id}_{i}",
+                            "memory_type": "fact",
+                            "tags": ["load_test", f"thread_{thread_id}"],
+                            "importance": 2
+                        })
+                    elif operation_type == 3:  # Memory update with different entity
+                        pending_updates.append({
+                            "entity": f"shared_entity_{i % 5}",
+                            "content": f"Shared memory entry from thread {thread_id}",
+                            "memory_type": "observation",
+                            "tags": ["shared", "load_test"],
+                            "importance": 1
+                        })
+                    else:
+                        start_time = time.time()
                         
-                    except Exception as e:
-                        duration = time.time() - start_time
-                        thread_errors += 1
-                        logger.error(f"Memory operation error in thread {thread_id}: {e}")
+                        try:
+                            if operation_type == 1:  # Memory search
+                                await memory_manager.search_memory("load_test", limit=10)
+                            else:  # Memory stats (cached)
+                                await cached_stats()
+                            
+                            duration = time.time() - start_time
+                            thread_success += 1
+                            thread_histogram.observe(duration)
+                            
+                        except Exception as e:
+                            thread_errors += 1
+                            logger.error("Memory operation error in thread %s: %s", thread_id, e)
+                    
+                    if len(pending_updates) >= batch_size:
+                        await flush_updates()
                 
-                # Update shared results
-                with results_lock:
-                    success_count += thread_success
-                    error_count += thread_errors
-                    response_times.extend(thread_times)
+                await flush_updates()
+                
+                return thread_success, thread_errors, thread_histogram
             
             # Run concurrent memory operations
             start_time = time.time()
@@ -290,7 +454,16 @@ class LoadTestSuite:
                 task = asyncio.create_task(memory_operations(thread_id))
                 tasks.append(task)
             
-            await asyncio.gather(*tasks)
+            worker_results = await asyncio.gather(*tasks)
+            
+            # Merge per-worker counters and histograms at the join point
+            success_count = 0
+            error_count = 0
+            histogram = LatencyHistogram(keep_samples=self.raw_samples)
+            for worker_success, worker_errors, worker_histogram in worker_results:
+                success_count += worker_success
+                error_count += worker_errors
+                histogram.merge(worker_histogram)
             
             total_duration = time.time() - start_time
             total_requests = concurrent_operations * operations_per_thread
@@ -301,20 +474,22 @@ class LoadTestSuite:
                 duration=total_duration,
                 success_count=success_count,
                 error_count=error_count,
-                response_times=response_times
+                response_times=histogram.samples,
+                histogram=histogram
             )
             
-            print(f"✅ Memory System Load Test completed:")
-            print(f"   Operations: {total_requests}, Success: {success_count}, Errors: {error_count}")
-            print(f"   Success Rate: {result.success_rate:.1f}%")
-            print(f"   OPS: {result.requests_per_second:.2f}")
-            print(f"   Avg Response: {result.avg_response_time:.3f}s")
-            print(f"   P95 Response: {result.p95_response_time:.3f}s")
+            if self.human:
+                print(f"✅ Memory System Load Test completed:")
+                print(f"   Operations: {total_requests}, Success: {success_count}, Errors: {error_count}")
+                print(f"   Success Rate: {result.success_rate:.1f}%")
+                print(f"   OPS: {result.requests_per_second:.2f}")
+                print(f"   Avg Response: {result.avg_response_time:.3f}s")
+                print(f"   P95 Response: {result.p95_response_time:.3f}s")
             
             return result
             
         except Exception as e:
-            print(f"❌ Memory system load test failed: {e}")
+            print(f"❌ Memory system load test failed: {e}", file=sys.stderr)
             return LoadTestResult(
                 test_name="Memory System Load Test",
                 total_requests=concurrent_operations * operations_per_thread,
@@ -327,7 +502,8 @@ class LoadTestSuite:
     async def load_test_session_system(self, concurrent_sessions: int = 15,
                                      operations_per_session: int = 50) -> LoadTestResult:
         """Нагрузочный тест системы сессий"""
-        print(f"🧪 Load Testing Session System ({concurrent_sessions} sessions, {operations_per_session} ops each)...")
+        if self.human:
+            print(f"🧪 Load Testing Session System ({concurrent_sessions} sessions, {operations_per_session} ops each)...")
         
         try:
             # Import session manager
@@ -343,20 +519,13 @@ class LoadTestSuite:
             # Create temporary directory
             temp_dir = self.create_temp_dir()
             session_manager = SessionManager(temp_dir)
-            
-            # Shared results storage
-            results_lock = threading.Lock()
-            success_count = 0
-            error_count = 0
-            response_times = []
+            await asyncio.wait_for(session_manager.ready(), timeout=5)
             
             async def session_operations(session_id_base: int):
                 """Операции с сессиями"""
-                nonlocal success_count, error_count, response_times
-                
                 session_success = 0
                 session_errors = 0
-                session_times = []
+                session_histogram = LatencyHistogram(keep_samples=self.raw_samples)
                 
                 # Create session
                 session_id = None
@@ -365,12 +534,12 @@ class LoadTestSuite:
                     session_id = await session_manager.create_session(f"load_test_user_{session_id_base}")
                     duration = time.time() - start_time
                     session_success += 1
-                    session_times.append(duration)
+                    session_histogram.observe(duration)
                 except Exception as e:
                     duration = time.time() - start_time
                     session_errors += 1
-                    logger.error(f"Session creation error: {e}")
-                    return
+                    logger.error("Session creation error: %s", e)
+                    return session_success, session_errors, session_histogram
                 
                 # Perform operations on the session
                 for i in range(operations_per_session - 1):  # -1 because we already created session
@@ -392,18 +561,14 @@ class LoadTestSuite:
                         
                         duration = time.time() - start_time
                         session_success += 1
-                        session_times.append(duration)
+                        session_histogram.observe(duration)
                         
                     except Exception as e:
                         duration = time.time() - start_time
                         session_errors += 1
-                        logger.error(f"Session operation error: {e}")
+                        logger.error("Session operation error: %s", e)
                 
-                # Update shared results
-                with results_lock:
-                    success_count += session_success
-                    error_count += session_errors
-                    response_times.extend(session_times)
+                return session_success, session_errors, session_histogram
             
             # Run concurrent session operations
             start_time = time.time()
@@ -413,7 +578,16 @@ class LoadTestSuite:
                 task = asyncio.create_task(session_operations(session_id))
                 tasks.append(task)
             
-            await asyncio.gather(*tasks)
+            worker_results = await asyncio.gather(*tasks)
+            
+            # Merge per-worker counters and histograms at the join point
+            success_count = 0
+            error_count = 0
+            histogram = LatencyHistogram(keep_samples=self.raw_samples)
+            for worker_success, worker_errors, worker_histogram in worker_results:
+                success_count += worker_success
+                error_count += worker_errors
+                histogram.merge(worker_histogram)
             
             total_duration = time.time() - start_time
             total_requests = concurrent_sessions * operations_per_session
@@ -427,20 +601,22 @@ class LoadTestSuite:
                 duration=total_duration,
                 success_count=success_count,
                 error_count=error_count,
-                response_times=response_times
+                response_times=histogram.samples,
+                histogram=histogram
             )
             
-            print(f"✅ Session System Load Test completed:")
-            print(f"   Operations: {total_requests}, Success: {success_count}, Errors: {error_count}")
-            print(f"   Success Rate: {result.success_rate:.1f}%")
-            print(f"   OPS: {result.requests_per_second:.2f}")
-            print(f"   Avg Response: {result.avg_response_time:.3f}s")
-            print(f"   P95 Response: {result.p95_response_time:.3f}s")
+            if self.human:
+                print(f"✅ Session System Load Test completed:")
+                print(f"   Operations: {total_requests}, Success: {success_count}, Errors: {error_count}")
+                print(f"   Success Rate: {result.success_rate:.1f}%")
+                print(f"   OPS: {result.requests_per_second:.2f}")
+                print(f"   Avg Response: {result.avg_response_time:.3f}s")
+                print(f"   P95 Response: {result.p95_response_time:.3f}s")
             
             return result
             
         except Exception as e:
-            print(f"❌ Session system load test failed: {e}")
+            print(f"❌ Session system load test failed: {e}", file=sys.stderr)
             return LoadTestResult(
                 test_name="Session System Load Test",
                 total_requests=concurrent_sessions * operations_per_session,
@@ -453,7 +629,8 @@ class LoadTestSuite:
     async def stress_test_concurrent_agents(self, num_agents: int = 5,
                                           commands_per_agent: int = 20) -> LoadTestResult:
         """Стресс-тест с несколькими агентами"""
-        print(f"🧪 Stress Testing Concurrent Agents ({num_agents} agents, {commands_per_agent} commands each)...")
+        if self.human:
+            print(f"🧪 Stress Testing Concurrent Agents ({num_agents} agents, {commands_per_agent} commands each)...")
         
         try:
             from agents.enhanced_recovery_agent_v2 import EnhancedRecoveryAgent
@@ -474,32 +651,44 @@ class LoadTestSuite:
             import tempfile
             import yaml
             
-            # Shared results storage
-            results_lock = threading.Lock()
-            success_count = 0
-            error_count = 0
-            response_times = []
+            # One config file is shared by the whole agent pool
+            with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
+                yaml.dump(test_config, f, default_flow_style=False, allow_unicode=True)
+                config_file = f.name
             
-            async def agent_stress_test(agent_id: int):
-                """Стресс-тест одного агента"""
-                nonlocal success_count, error_count, response_times
+            async def make_agent():
+                agent = EnhancedRecoveryAgent(config_file)
+                await agent.initialize()
+                return agent
+            
+            pool = []
+            try:
+                # Initialize the agent pool up front so init cost is not counted as command time
+                pool_size = max(1, min(num_agents, os.cpu_count() or 1))
+                init_start = time.time()
+                init_results = await asyncio.gather(
+                    *(make_agent() for _ in range(pool_size)), return_exceptions=True
+                )
+                init_duration = time.time() - init_start
                 
-                agent_success = 0
-                agent_errors = 0
-                agent_times = []
+                # Keep the agents that came up so they are always cleaned up below
+                pool = [a for a in init_results if not isinstance(a, BaseException)]
+                init_errors = [a for a in init_results if isinstance(a, BaseException)]
+                for error in init_errors:
+                    logger.error("Agent pool init error: %s", error)
+                if not pool:
+                    raise init_errors[0]
+                pool_size = len(pool)
                 
-                # Create config file for this agent
-                with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-                    yaml.dump(test_config, f, default_flow_style=False, allow_unicode=True)
-                    config_file = f.name
+                # Test commands
+                test_commands = ["help", "status", "session info", "memory"]
                 
-                try:
-                    # Initialize agent
-                    agent = EnhancedRecoveryAgent(config_file)
-                    await agent.initialize()
-                    
-                    # Test commands
-                    test_commands = ["help", "status", "session info", "memory"]
+                async def agent_stress_test(agent_id: int):
+                    """Стресс-тест одного агента"""
+                    agent = pool[agent_id % len(pool)]
+                    agent_success = 0
+                    agent_errors = 0
+                    agent_histogram = LatencyHistogram(keep_samples=self.raw_samples)
                     
                     for i in range(commands_per_agent):
                         command = test_commands[i % len(test_commands)]
@@ -511,39 +700,42 @@ class LoadTestSuite:
                             
                             if response:
                                 agent_success += 1
-                                agent_times.append(duration)
+                                agent_histogram.observe(duration)
                             else:
                                 agent_errors += 1
                                 
                         except Exception as e:
-                            duration = time.time() - start_time
                             agent_errors += 1
-                            logger.error(f"Agent {agent_id} command error: {e}")
+                            logger.error("Agent %s command error: %s", agent_id, e)
                     
-                    # Cleanup agent
-                    await agent._cleanup()
-                    
-                finally:
-                    os.unlink(config_file)
+                    return agent_success, agent_errors, agent_histogram
                 
-                # Update shared results
-                with results_lock:
-                    success_count += agent_success
-                    error_count += agent_errors
-                    response_times.extend(agent_times)
-            
-            # Run concurrent agents
-            start_time = time.time()
-            
-            tasks = []
-            for agent_id in range(num_agents):
-                task = asyncio.create_task(agent_stress_test(agent_id))
-                tasks.append(task)
-            
-            await asyncio.gather(*tasks)
-            
-            total_duration = time.time() - start_time
-            total_requests = num_agents * commands_per_agent
+                # Run concurrent agents
+                start_time = time.time()
+                
+                tasks = []
+                for agent_id in range(num_agents):
+                    task = asyncio.create_task(agent_stress_test(agent_id))
+                    tasks.append(task)
+                
+                worker_results = await asyncio.gather(*tasks)
+                
+                # Merge per-worker counters and histograms at the join point
+                success_count = 0
+                error_count = 0
+                histogram = LatencyHistogram(keep_samples=self.raw_samples)
+                for worker_success, worker_errors, worker_histogram in worker_results:
+                    success_count += worker_success
+                    error_count += worker_errors
+                    histogram.merge(worker_histogram)
+                
+                total_duration = time.time() - start_time
+                total_requests = num_agents * commands_per_agent
+                
+            finally:
+                # Cleanup agent pool
+                await asyncio.gather(*(agent._cleanup() for agent in pool), return_exceptions=True)
+                os.unlink(config_file)
             
             result = LoadTestResult(
                 test_name="Concurrent Agents Stress Test",
@@ -551,20 +743,23 @@ class LoadTestSuite:
                 duration=total_duration,
                 success_count=success_count,
                 error_count=error_count,
-                response_times=response_times
+                response_times=histogram.samples,
+                histogram=histogram
             )
             
-            print(f"✅ Concurrent Agents Stress Test completed:")
-            print(f"   Requests: {total_requests}, Success: {success_count}, Errors: {error_count}")
-            print(f"   Success Rate: {result.success_rate:.1f}%")
-            print(f"   RPS: {result.requests_per_second:.2f}")
-            print(f"   Avg Response: {result.avg_response_time:.3f}s")
-            print(f"   P99 Response: {result.p99_response_time:.3f}s")
+            if self.human:
+                print(f"✅ Concurrent Agents Stress Test completed:")
+                print(f"   Agent pool: {pool_size} agents, init {init_duration:.3f}s")
+                print(f"   Requests: {total_requests}, Success: {success_count}, Errors: {error_count}")
+                print(f"   Success Rate: {result.success_rate:.1f}%")
+                print(f"   RPS: {result.requests_per_second:.2f}")
+                print(f"   Avg Response: {result.avg_response_time:.3f}s")
+                print(f"   P99 Response: {result.p99_response_time:.3f}s")
             
             return result
             
         except Exception as e:
-            print(f"❌ Concurrent agents stress test failed: {e}")
+            print(f"❌ Concurrent agents stress test failed: {e}", file=sys.stderr)
             return LoadTestResult(
                 test_name="Concurrent Agents Stress Test",
                 total_requests=num_agents * commands_per_agent,
@@ -576,7 +771,8 @@ class LoadTestSuite:
     
     async def memory_stress_test(self, duration_seconds: int = 30) -> LoadTestResult:
         """Стресс-тест памяти системы"""
-        print(f"🧪 Memory Stress Test (running for {duration_seconds} seconds)...")
+        if self.human:
+            print(f"🧪 Memory Stress Test (running for {duration_seconds} seconds)...")
         
         try:
             # Import memory manager
@@ -596,15 +792,16 @@ class LoadTestSuite:
             # Stress test variables
             success_count = 0
             error_count = 0
-            response_times = []
+            histogram = LatencyHistogram(keep_samples=self.raw_samples)
             
-            start_time = time.time()
-            end_time = start_time + duration_seconds
+            # Integer monotonic clock: no float allocation per iteration
+            start_ns = time.perf_counter_ns()
+            deadline_ns = start_ns + duration_seconds * 1_000_000_000
             
             operation_counter = 0
             
-            while time.time() < end_time:
-                operation_start = time.time()
+            while time.perf_counter_ns() < deadline_ns:
+                operation_start_ns = time.perf_counter_ns()
                 
                 try:
                     # Alternate between different operations
@@ -624,21 +821,20 @@ class LoadTestSuite:
                         # Memory stats
                         await memory_manager.get_memory_stats()
                     
-                    duration = time.time() - operation_start
+                    duration_ns = time.perf_counter_ns() - operation_start_ns
                     success_count += 1
-                    response_times.append(duration)
+                    histogram.observe(duration_ns / 1e9)
                     
                 except Exception as e:
-                    duration = time.time() - operation_start
                     error_count += 1
-                    logger.error(f"Memory stress operation error: {e}")
+                    logger.error("Memory stress operation error: %s", e)
                 
                 operation_counter += 1
                 
                 # Small delay to prevent overwhelming the system
                 await asyncio.sleep(0.001)
             
-            total_duration = time.time() - start_time
+            total_duration = (time.perf_counter_ns() - start_ns) / 1e9
             total_requests = success_count + error_count
             
             result = LoadTestResult(
@@ -647,20 +843,22 @@ class LoadTestSuite:
                 duration=total_duration,
                 success_count=success_count,
                 error_count=error_count,
-                response_times=response_times
+                response_times=histogram.samples,
+                histogram=histogram
             )
             
-            print(f"✅ Memory Stress Test completed:")
-            print(f"   Operations: {total_requests}, Success: {success_count}, Errors: {error_count}")
-            print(f"   Success Rate: {result.success_rate:.1f}%")
-            print(f"   OPS: {result.requests_per_second:.2f}")
-            print(f"   Avg Response: {result.avg_response_time:.3f}s")
-            print(f"   Max Response: {result.max_response_time:.3f}s")
+            if self.human:
+                print(f"✅ Memory Stress Test completed:")
+                print(f"   Operations: {total_requests}, Success: {success_count}, Errors: {error_count}")
+                print(f"   Success Rate: {result.success_rate:.1f}%")
+                print(f"   OPS: {result.requests_per_second:.2f}")
+                print(f"   Avg Response: {result.avg_response_time:.3f}s")
+                print(f"   Max Response: {result.max_response_time:.3f}s")
             
             return result
             
         except Exception as e:
-            print(f"❌ Memory stress test failed: {e}")
+            print(f"❌ Memory stress test failed: {e}", file=sys.stderr)
             return LoadTestResult(
                 test_name="Memory Stress Test",
                 total_requests=0,
@@ -670,9 +868,36 @@ class LoadTestSuite:
                 response_times=[]
             )
     
-    async def run_all_load_tests(self) -> Dict[str, Any]:
-        """Выполнение всех нагрузочных тестов"""
-        print("🚀 Starting Load Testing Suite...\n")
+    async def _run_load_test(self, test_name: str, test_func, test_params: Dict[str, Any]) -> LoadTestResult:
+        """Выполнение одного нагрузочного теста"""
+        if self.human:
+            print(f"\n{'='*70}")
+            print(f"🔥 {test_name}")
+            print(f"{'='*70}")
+        
+        try:
+            return await test_func(**test_params)
+        except Exception as e:
+            print(f"💥 {test_name} crashed: {e}", file=sys.stderr)
+            # Create a failed result
+            return LoadTestResult(
+                test_name=test_name,
+                total_requests=0,
+                duration=0,
+                success_count=0,
+                error_count=1,
+                response_times=[]
+            )
+    
+    async def run_all_load_tests(self, parallel: bool = False) -> Dict[str, Any]:
+        """Выполнение всех нагрузочных тестов
+        
+        parallel=True runs the tests that use disjoint temp dirs and modules
+        concurrently. Agent tests stay serial so their RPS numbers are not
+        skewed by the other scenarios competing for the event loop.
+        """
+        if self.human:
+            print("🚀 Starting Load Testing Suite...\n")
         
         start_time = time.time()
         
@@ -685,30 +910,29 @@ class LoadTestSuite:
             ("Stress Test - Memory", self.memory_stress_test, {"duration_seconds": 20}),
         ]
         
-        # Run all load tests
-        for test_name, test_func, test_params in load_tests:
-            print(f"\n{'='*70}")
-            print(f"🔥 {test_name}")
-            print(f"{'='*70}")
-            
-            try:
-                result = await test_func(**test_params)
-                self.results.append(result)
-            except Exception as e:
-                print(f"💥 {test_name} crashed: {e}")
-                # Create a failed result
-                failed_result = LoadTestResult(
-                    test_name=test_name,
-                    total_requests=0,
-                    duration=0,
-                    success_count=0,
-                    error_count=1,
-                    response_times=[]
-                )
-                self.results.append(failed_result)
+        # Memory/session tests use disjoint temp dirs and modules, so they can overlap
+        independent_funcs = (self.load_test_memory_system, self.load_test_session_system, self.memory_stress_test)
+        independent_group = [t for t in load_tests if t[1] in independent_funcs]
+        serial_group = [t for t in load_tests if t[1] not in independent_funcs]
+        
+        if parallel:
+            results = await asyncio.gather(
+                *(self._run_load_test(name, func, params) for name, func, params in independent_group)
+            )
+            self.results.extend(results)
+            for test_name, test_func, test_params in serial_group:
+                self.results.append(await self._run_load_test(test_name, test_func, test_params))
+        else:
+            for test_name, test_func, test_params in load_tests:
+                self.results.append(await self._run_load_test(test_name, test_func, test_params))
         
         total_duration = time.time() - start_time
         
+        # Machine-readable results are emitted once all tests have finished
+        if not self.human:
+            for result in self.results:
+                report_result(result)
+        
         # Generate summary
         summary = self._generate_load_test_summary(total_duration)
         
@@ -716,13 +940,13 @@ class LoadTestSuite:
     
     def _generate_load_test_summary(self, total_duration: float) -> Dict[str, Any]:
         """Генерация сводки нагрузочных тестов"""
-        total_requests = sum(r.total_requests for r in self.results)
-        total_success = sum(r.success_count for r in self.results)
-        total_errors = sum(r.error_count for r in self.results)
-        
-        all_response_times = []
-        for result in self.results:
-            all_response_times.extend(result.response_times)
+        total_requests = 0
+        total_success = 0
+        total_errors = 0
+        for r in self.results:
+            total_requests += r.total_requests
+            total_success += r.success_count
+            total_errors += r.error_count
         
         # Calculate overall metrics
         overall_success_rate = (total_success / total_requests) * 100 if total_requests > 0 else 0
@@ -740,7 +964,7 @@ class LoadTestSuite:
             "overall_success_rate": overall_success_rate,
             "overall_rps": overall_rps,
             "performance_grade": performance_grade,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
             "test_results": [
                 {
                     "test_name": r.test_name,
@@ -767,62 +991,71 @@ class LoadTestSuite:
         if not results:
             return "F"
         
-        # Criteria for grading
-        avg_success_rate = sum(r.success_rate for r in results) / len(results)
-        avg_response_time = sum(r.avg_response_time for r in results) / len(results)
-        max_p99_time = max((r.p99_response_time for r in results), default=0)
+        # Criteria for grading, gathered in a single pass
+        success_rate_sum = 0.0
+        response_time_sum = 0.0
+        max_p99_time = 0.0
+        for r in results:
+            success_rate_sum += r.success_rate
+            response_time_sum += r.avg_response_time
+            if r.p99_response_time > max_p99_time:
+                max_p99_time = r.p99_response_time
+        
+        avg_success_rate = success_rate_sum / len(results)
+        avg_response_time = response_time_sum / len(results)
         
         # Grading logic
-        if avg_success_rate >= 99 and avg_response_time <= 0.1 and max_p99_time <= 0.5:
-            return "A+"
-        elif avg_success_rate >= 95 and avg_response_time <= 0.2 and max_p99_time <= 1.0:
-            return "A"
-        elif avg_success_rate >= 90 and avg_response_time <= 0.5 and max_p99_time <= 2.0:
-            return "B"
-        elif avg_success_rate >= 80 and avg_response_time <= 1.0 and max_p99_time <= 5.0:
-            return "C"
-        elif avg_success_rate >= 70:
-            return "D"
-        else:
-            return "F"
+        for grade, min_success_rate, max_avg_time, max_p99 in PERFORMANCE_GRADES:
+            if avg_success_rate >= min_success_rate and avg_response_time <= max_avg_time and max_p99_time <= max_p99:
+                return grade
+        return "F"
     
     def print_load_test_summary(self, summary: Dict[str, Any]):
         """Вывод сводки нагрузочных тестов"""
-        print(f"\n" + "="*80)
-        print(f"📊 LOAD TESTING SUMMARY")
-        print(f"="*80)
-        print(f"Total Duration: {summary['total_duration']:.2f}s")
-        print(f"Total Requests: {summary['total_requests']:,}")
-        print(f"Successful: {summary['total_success']:,} ({summary['overall_success_rate']:.1f}%)")
-        print(f"Failed: {summary['total_errors']:,}")
-        print(f"Overall RPS: {summary['overall_rps']:.2f}")
-        print(f"Performance Grade: {summary['performance_grade']}")
-        
-        print(f"\n📈 Individual Test Results:")
-        print(f"{'Test Name':<35} {'Requests':<10} {'Success%':<10} {'RPS':<8} {'Avg(ms)':<10} {'P95(ms)':<10}")
-        print(f"{'-'*35} {'-'*10} {'-'*10} {'-'*8} {'-'*10} {'-'*10}")
+        lines = [
+            "",
+            "="*80,
+            f"📊 LOAD TESTING SUMMARY",
+            "="*80,
+            f"Total Duration: {summary['total_duration']:.2f}s",
+            f"Total Requests: {summary['total_requests']:,}",
+            f"Successful: {summary['total_success']:,} ({summary['overall_success_rate']:.1f}%)",
+            f"Failed: {summary['total_errors']:,}",
+            f"Overall RPS: {summary['overall_rps']:.2f}",
+            f"Performance Grade: {summary['performance_grade']}",
+            "",
+            f"📈 Individual Test Results:",
+            f"{'Test Name':<35} {'Requests':<10} {'Success%':<10} {'RPS':<8} {'Avg(ms)':<10} {'P95(ms)':<10}",
+            f"{'-'*35} {'-'*10} {'-'*10} {'-'*8} {'-'*10} {'-'*10}",
+        ]
         
         for result in summary['test_results']:
-            print(f"{result['test_name']:<35} "
-                  f"{result['total_requests']:<10} "
-                  f"{result['success_rate']:<10.1f} "
-                  f"{result['requests_per_second']:<8.1f} "
-                  f"{result['avg_response_time']*1000:<10.1f} "
-                  f"{result['p95_response_time']*1000:<10.1f}")
+            lines.append(f"{result['test_name']:<35} "
+                         f"{result['total_requests']:<10} "
+                         f"{result['success_rate']:<10.1f} "
+                         f"{result['requests_per_second']:<8.1f} "
+                         f"{result['avg_response_time']*1000:<10.1f} "
+                         f"{result['p95_response_time']*1000:<10.1f}")
         
         # Performance assessment
         grade = summary['performance_grade']
+        lines.append("")
         if grade in ['A+', 'A']:
-            print(f"\n🎉 EXCELLENT PERFORMANCE! Grade: {grade}")
-            print("✅ System handles load very well and is ready for production.")
+            lines.append(f"🎉 EXCELLENT PERFORMANCE! Grade: {grade}")
+            lines.append("✅ System handles load very well and is ready for production.")
         elif grade in ['B', 'C']:
-            print(f"\n👍 GOOD PERFORMANCE! Grade: {grade}")
-            print("✅ System handles load adequately. Consider optimization for higher loads.")
+            lines.append(f"👍 GOOD PERFORMANCE! Grade: {grade}")
+            lines.append("✅ System handles load adequately. Consider optimization for higher loads.")
         else:
-            print(f"\n⚠️ PERFORMANCE ISSUES! Grade: {grade}")
-            print("🔧 System needs optimization before handling production load.")
+            lines.append(f"⚠️ PERFORMANCE ISSUES! Grade: {grade}")
+            lines.append("🔧 System needs optimization before handling production load.")
         
-        print(f"="*80)
+        lines.append("="*80)
+        
+        # Single write instead of one print() per line; outside --human the
+        # summary goes to stderr so stdout stays pure NDJSON
+        stream = sys.stdout if self.human else sys.stderr
+        stream.write("\n".join(lines) + "\n")
     
     def save_load_test_results(self, summary: Dict[str, Any]):
         """Сохранение результатов нагрузочных тестов"""
@@ -830,37 +1063,43 @@ class LoadTestSuite:
             results_dir = Path("test_results")
             results_dir.mkdir(exist_ok=True)
             
-            # Save JSON results
-            with open(results_dir / "load_test_results.json", 'w', encoding='utf-8') as f:
-                json.dump(summary, f, indent=2, ensure_ascii=False)
+            # Save JSON results: encode once, write once
+            if orjson is not None:
+                data = orjson.dumps(summary, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+            else:
+                data = json.dumps(summary, indent=2, ensure_ascii=False).encode('utf-8')
+            with open(results_dir / "load_test_results.json", 'wb') as f:
+                f.write(data)
             
             # Save detailed report
+            parts = [
+                f"Enhanced Recovery Agent - Load Testing Report\n",
+                f"Generated: {summary['timestamp']}\n",
+                f"="*60 + "\n\n",
+                f"SUMMARY:\n",
+                f"Total Duration: {summary['total_duration']:.2f}s\n",
+                f"Total Requests: {summary['total_requests']:,}\n",
+                f"Success Rate: {summary['overall_success_rate']:.1f}%\n",
+                f"Overall RPS: {summary['overall_rps']:.2f}\n",
+                f"Performance Grade: {summary['performance_grade']}\n\n",
+                f"DETAILED RESULTS:\n",
+            ]
+            for result in summary['test_results']:
+                parts.append(f"\n{result['test_name']}:\n")
+                parts.append(f"  Requests: {result['total_requests']:,}\n")
+                parts.append(f"  Success Rate: {result['success_rate']:.1f}%\n")
+                parts.append(f"  RPS: {result['requests_per_second']:.2f}\n")
+                parts.append(f"  Avg Response: {result['avg_response_time']:.3f}s\n")
+                parts.append(f"  P95 Response: {result['p95_response_time']:.3f}s\n")
+                parts.append(f"  P99 Response: {result['p99_response_time']:.3f}s\n")
+            
             with open(results_dir / "load_test_report.txt", 'w', encoding='utf-8') as f:
-                f.write(f"Enhanced Recovery Agent - Load Testing Report\n")
-                f.write(f"Generated: {summary['timestamp']}\n")
-                f.write(f"="*60 + "\n\n")
-                
-                f.write(f"SUMMARY:\n")
-                f.write(f"Total Duration: {summary['total_duration']:.2f}s\n")
-                f.write(f"Total Requests: {summary['total_requests']:,}\n")
-                f.write(f"Success Rate: {summary['overall_success_rate']:.1f}%\n")
-                f.write(f"Overall RPS: {summary['overall_rps']:.2f}\n")
-                f.write(f"Performance Grade: {summary['performance_grade']}\n\n")
-                
-                f.write(f"DETAILED RESULTS:\n")
-                for result in summary['test_results']:
-                    f.write(f"\n{result['test_name']}:\n")
-                    f.write(f"  Requests: {result['total_requests']:,}\n")
-                    f.write(f"  Success Rate: {result['success_rate']:.1f}%\n")
-                    f.write(f"  RPS: {result['requests_per_second']:.2f}\n")
-                    f.write(f"  Avg Response: {result['avg_response_time']:.3f}s\n")
-                    f.write(f"  P95 Response: {result['p95_response_time']:.3f}s\n")
-                    f.write(f"  P99 Response: {result['p99_response_time']:.3f}s\n")
-            
-            print(f"\n💾 Load test results saved to: test_results/")
+                f.write("".join(parts))
+            
+            print(f"\n💾 Load test results saved to: test_results/", file=sys.stderr)
             
         except Exception as e:
-            print(f"Failed to save load test results: {e}")
+            print(f"Failed to save load test results: {e}", file=sys.stderr)
     
     async def cleanup(self):
         """Очистка ресурсов"""
@@ -868,11 +1107,11 @@ class LoadTestSuite:
 
 async def main():
     """Основная функция для запуска нагрузочных тестов"""
-    test_suite = LoadTestSuite()
+    test_suite = LoadTestSuite(human="--human" in sys.argv, raw_samples="--raw-samples" in sys.argv)
     
     try:
         # Run all load tests
-        summary = await test_suite.run_all_load_tests()
+        summary = await test_suite.run_all_load_tests(parallel="--parallel" in sys.argv)
         
         # Print summary
         test_suite.print_load_test_summary(summary)
@@ -888,10 +1127,10 @@ async def main():
             return 1  # Performance issues
         
     except KeyboardInterrupt:
-        print("\n⚠️ Load tests interrupted by user")
+        print("\n⚠️ Load tests interrupted by user", file=sys.stderr)
         return 130
     except Exception as e:
-        print(f"\n💥 Load tests crashed: {e}")
+        print(f"\n💥 Load tests crashed: {e}", file=sys.stderr)
         return 1
     finally:
         await test_suite.cleanup()
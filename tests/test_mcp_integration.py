@@ -6,7 +6,6 @@ Test MCP Integration with Enhanced Recovery Agent
 import asyncio
 import sys
 import os
-import json
 from pathlib import Path
 
 # Add project root to path
@@ -14,6 +13,24 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from agents.enhanced_recovery_agent_v2 import EnhancedRecoveryAgent
 
+# Test recovery config, pre-rendered so the YAML emitter is not run per test
+TEST_RECOVERY_CONFIG_YAML = """\
+services:
+- name: test-service
+  port: 13000
+  endpoint: /health
+  timeout: 5
+monitoring:
+  interval: 10
+  health_check_interval: 30
+  recovery_attempts: 2
+  cooldown_period: 60
+recovery:
+  max_concurrent_recoveries: 1
+  restart_timeout: 30
+  health_check_retries: 2
+"""
+
 async def test_mcp_integration():
     """Test MCP integration functionality"""
     print("🧪 Testing MCP Integration with Enhanced Recovery Agent...")
@@ -22,27 +39,9 @@ async def test_mcp_integration():
     config_dir = Path("config")
     config_dir.mkdir(exist_ok=True)
     
-    test_config = {
-        "services": [
-            {"name": "test-service", "port": 13000, "endpoint": "/health", "timeout": 5}
-        ],
-        "monitoring": {
-            "interval": 10,
-            "health_check_interval": 30,
-            "recovery_attempts": 2,
-            "cooldown_period": 60
-        },
-        "recovery": {
-            "max_concurrent_recoveries": 1,
-            "restart_timeout": 30,
-            "health_check_retries": 2
-        }
-    }
-    
     # Write test config
-    import yaml
     with open("config/test-recovery-config.yaml", "w", encoding="utf-8") as f:
-        yaml.dump(test_config, f, default_flow_style=False, allow_unicode=True)
+        f.write(TEST_RECOVERY_CONFIG_YAML)
     
     try:
         # Initialize agent
@@ -98,10 +97,7 @@ async def test_mcp_configuration():
     """Test MCP configuration loading"""
     print("\n🧪 Testing MCP Configuration...")
     
-    # Create test MCP config
-    mcp_config_dir = Path(".kiro/settings")
-    mcp_config_dir.mkdir(parents=True, exist_ok=True)
-    
+    # Test MCP config (loaded from memory, no file round-trip)
     test_mcp_config = {
         "mcpServers": {
             "traffic-router-mcp": {
@@ -125,10 +121,6 @@ async def test_mcp_configuration():
         }
     }
     
-    # Write test MCP config
-    with open(".kiro/settings/mcp.json", "w", encoding="utf-8") as f:
-        json.dump(test_mcp_config, f, indent=2, ensure_ascii=False)
-    
     try:
         # Test MCP integration import
         from lib.mcp_ai_agent_integration import MCPAIAgentIntegration, MCPConnectionManager
@@ -136,11 +128,11 @@ async def test_mcp_configuration():
         
         # Test connection manager initialization
         connection_manager = MCPConnectionManager(".kiro/settings/mcp.json")
-        await connection_manager.load_configuration()
+        connection_manager.load_configuration_from_dict(test_mcp_config)
         print(f"✅ MCP configuration loaded: {len(connection_manager.servers)} servers")
         
-        # Test server configuration
-        for server_id, server_config in connection_manager.servers.items():
+        # Test server configuration (snapshot the server table once)
+        for server_id, server_config in list(connection_manager.servers.items()):
             print(f"   - {server_id}: {server_config.url} (auto-approve: {len(server_config.auto_approve)} tools)")
         
         print("\n🎉 MCP configuration tests passed!")
@@ -4,79 +4,161 @@ NTFS/fuseblk Fixes Tests
 Тесты для проверки исправлений проблем с файловой системой NTFS/fuseblk
 """
 
+import functools
 import subprocess
 import sys
 import os
 import json
+import mmap
+import re
+import stat
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+
+# Full per-item reports (and no early exit) only when explicitly requested
+VERBOSE = os.environ.get('TRAFFIC_ROUTER_TEST_VERBOSE') == '1'
+log = print if VERBOSE else (lambda *args, **kwargs: None)
+
+@functools.lru_cache(maxsize=32)
+def _load_json_cached(path: str, mtime: float) -> Dict[str, Any]:
+    """Parse a JSON file once per (path, mtime) pair"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+@functools.lru_cache(maxsize=1)
+def _root_names() -> frozenset:
+    """Names in the project root, listed once and shared by all existence checks"""
+    return frozenset(os.listdir('.'))
+
+def _find_needles(path: str, needles: List[str], stop_after: Optional[int] = None) -> set:
+    """Return which needles occur in a file using one combined regex pass
+    
+    The file is memory-mapped and scanned as bytes, so it is never decoded.
+    With stop_after, scanning ends as soon as that many distinct needles are found.
+    """
+    pattern = re.compile(b'|'.join(re.escape(needle.encode('utf-8')) for needle in needles))
+    found = set()
+    
+    with open(path, 'rb') as f:
+        # mmap cannot map an empty file
+        if os.fstat(f.fileno()).st_size == 0:
+            return found
+        
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for match in pattern.finditer(mm):
+                found.add(match.group().decode('utf-8'))
+                if stop_after is not None and len(found) >= stop_after:
+                    break
+    
+    return found
+
+def _detect_fs_type(path: str = '.') -> str:
+    """Resolve the filesystem type of path from /proc/self/mountinfo"""
+    dev = os.stat(path).st_dev
+    device_id = f"{os.major(dev)}:{os.minor(dev)}"
+    
+    with open('/proc/self/mountinfo', 'r', encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    
+    # Later mounts shadow earlier ones on the same device, so keep the last match
+    fs_type = None
+    for line in lines:
+        fields = line.split()
+        if len(fields) > 2 and fields[2] == device_id and ' - ' in line:
+            fs_type = line.split(' - ', 1)[1].split()[0]
+    
+    if fs_type is None:
+        raise OSError(f"Device {device_id} not found in mountinfo")
+    return fs_type
+
+def _detect_fs_type_df(path: str = '.') -> str:
+    """Fallback filesystem detection via df -T for non-Linux hosts"""
+    result = subprocess.run(['df', '-T', path], 
+                          capture_output=True, text=True, timeout=10)
+    
+    if result.returncode != 0:
+        raise OSError("Failed to detect filesystem")
+    
+    lines = result.stdout.strip().split('\n')
+    if len(lines) < 2:
+        raise OSError("Could not parse filesystem information")
+    return lines[1].split()[1]
+
+@functools.lru_cache(maxsize=1)
+def _detect_fs() -> str:
+    """Filesystem type of the project root, detected once per process"""
+    try:
+        return _detect_fs_type('.')
+    except OSError:
+        return _detect_fs_type_df('.')
 
 def test_filesystem_detection():
     """Test filesystem detection"""
-    print("🧪 Testing Filesystem Detection...")
+    log("🧪 Testing Filesystem Detection...")
     
     try:
-        # Get filesystem type
-        result = subprocess.run(['df', '-T', '.'], 
-                              capture_output=True, text=True, timeout=10)
+        fs_type = _detect_fs()
         
-        if result.returncode == 0:
-            lines = result.stdout.strip().split('\n')
-            if len(lines) >= 2:
-                fs_type = lines[1].split()[1]
-                print(f"✅ Detected filesystem: {fs_type}")
-                
-                if fs_type in ['fuseblk', 'ntfs']:
-                    print("⚠️ NTFS/fuseblk filesystem detected - compatibility fixes needed")
-                    return True, fs_type
-                else:
-                    print("✅ Standard filesystem - minimal fixes needed")
-                    return True, fs_type
-            else:
-                print("❌ Could not parse filesystem information")
-                return False, "unknown"
+        log(f"✅ Detected filesystem: {fs_type}")
+        
+        if fs_type in ['fuseblk', 'ntfs']:
+            print("⚠️ NTFS/fuseblk filesystem detected - compatibility fixes needed")
         else:
-            print("❌ Failed to detect filesystem")
-            return False, "unknown"
+            log("✅ Standard filesystem - minimal fixes needed")
+        return True, fs_type
             
     except Exception as e:
         print(f"❌ Filesystem detection error: {e}")
         return False, "unknown"
 
+def _scan_dir(path: str) -> Dict[str, os.DirEntry]:
+    """Map entry names to DirEntry objects with a single directory read"""
+    try:
+        with os.scandir(path) as it:
+            return {entry.name: entry for entry in it}
+    except FileNotFoundError:
+        return {}
+
 def test_script_permissions():
     """Test script file permissions"""
-    print("\n🧪 Testing Script Permissions...")
+    log("\n🧪 Testing Script Permissions...")
     
     scripts = [
-        "scripts/quick-build.sh",
-        "scripts/build-ntfs-fix.sh", 
-        "scripts/fix-permissions.sh"
+        "quick-build.sh",
+        "build-ntfs-fix.sh", 
+        "fix-permissions.sh"
     ]
     
+    scripts_entries = _scan_dir('scripts')
     success_count = 0
+    found_count = 0
     
-    for script in scripts:
-        if not os.path.exists(script):
+    for name in scripts:
+        script = f"scripts/{name}"
+        entry = scripts_entries.get(name)
+        if entry is None:
             print(f"⚠️ Script not found: {script}")
             continue
         
+        found_count += 1
+        
         # Check if file is executable
-        if os.access(script, os.X_OK):
-            print(f"✅ {script} is executable")
+        if entry.stat().st_mode & stat.S_IXUSR:
+            log(f"✅ {script} is executable")
             success_count += 1
         else:
             print(f"❌ {script} is not executable")
     
-    return success_count == len([s for s in scripts if os.path.exists(s)])
+    return success_count == found_count
 
 def test_npm_scripts():
     """Test npm scripts for NTFS fixes"""
-    print("\n🧪 Testing NPM Scripts...")
+    log("\n🧪 Testing NPM Scripts...")
     
     try:
-        with open('package.json', 'r', encoding='utf-8') as f:
-            package_data = json.load(f)
+        package_data = _load_json_cached('package.json', os.path.getmtime('package.json'))
         
         scripts = package_data.get('scripts', {})
         
@@ -90,7 +172,7 @@ def test_npm_scripts():
         
         for script_name in required_scripts:
             if script_name in scripts:
-                print(f"✅ Found script: {script_name}")
+                log(f"✅ Found script: {script_name}")
                 success_count += 1
             else:
                 print(f"❌ Missing script: {script_name}")
@@ -103,16 +185,13 @@ def test_npm_scripts():
 
 def test_next_config():
     """Test Next.js configuration for NTFS compatibility"""
-    print("\n🧪 Testing Next.js Configuration...")
+    log("\n🧪 Testing Next.js Configuration...")
     
-    if not os.path.exists('next.config.mjs'):
+    if 'next.config.mjs' not in _root_names():
         print("❌ next.config.mjs not found")
         return False
     
     try:
-        with open('next.config.mjs', 'r', encoding='utf-8') as f:
-            config_content = f.read()
-        
         # Check for NTFS-specific fixes
         ntfs_fixes = [
             'esmExternals',
@@ -121,16 +200,17 @@ def test_next_config():
             'cache = false'
         ]
         
-        found_fixes = []
+        required_fixes = 2
+        found_fixes = _find_needles('next.config.mjs', ntfs_fixes,
+                                    stop_after=None if VERBOSE else required_fixes)
         for fix in ntfs_fixes:
-            if fix in config_content:
-                found_fixes.append(fix)
-                print(f"✅ Found NTFS fix: {fix}")
-            else:
+            if fix in found_fixes:
+                log(f"✅ Found NTFS fix: {fix}")
+            elif VERBOSE or len(found_fixes) < required_fixes:
                 print(f"⚠️ NTFS fix not found: {fix}")
         
-        if len(found_fixes) >= 2:
-            print("✅ Next.js configuration has NTFS compatibility fixes")
+        if len(found_fixes) >= required_fixes:
+            log("✅ Next.js configuration has NTFS compatibility fixes")
             return True
         else:
             print("❌ Next.js configuration lacks NTFS compatibility fixes")
@@ -142,18 +222,15 @@ def test_next_config():
 
 def test_environment_setup():
     """Test environment configuration for NTFS"""
-    print("\n🧪 Testing Environment Configuration...")
+    log("\n🧪 Testing Environment Configuration...")
     
     # Check for .env.local
     env_files = ['.env.local', '.env']
     env_found = False
     
     for env_file in env_files:
-        if os.path.exists(env_file):
+        if env_file in _root_names():
             try:
-                with open(env_file, 'r', encoding='utf-8') as f:
-                    env_content = f.read()
-                
                 # Check for NTFS-specific environment variables
                 ntfs_vars = [
                     'CHOKIDAR_USEPOLLING',
@@ -161,15 +238,14 @@ def test_environment_setup():
                     'NODE_OPTIONS'
                 ]
                 
-                found_vars = []
+                found_vars = _find_needles(env_file, ntfs_vars)
                 for var in ntfs_vars:
-                    if var in env_content:
-                        found_vars.append(var)
-                        print(f"✅ Found environment variable: {var}")
+                    if var in found_vars:
+                        log(f"✅ Found environment variable: {var}")
                 
                 if found_vars:
                     env_found = True
-                    print(f"✅ Environment file {env_file} has NTFS compatibility settings")
+                    log(f"✅ Environment file {env_file} has NTFS compatibility settings")
                     break
                     
             except Exception as e:
@@ -183,16 +259,13 @@ def test_environment_setup():
 
 def test_gitignore_setup():
     """Test .gitignore for NTFS-specific entries"""
-    print("\n🧪 Testing .gitignore Configuration...")
+    log("\n🧪 Testing .gitignore Configuration...")
     
-    if not os.path.exists('.gitignore'):
+    if '.gitignore' not in _root_names():
         print("⚠️ .gitignore not found")
         return False
     
     try:
-        with open('.gitignore', 'r', encoding='utf-8') as f:
-            gitignore_content = f.read()
-        
         # Check for NTFS-specific entries
         ntfs_entries = [
             '.next/',
@@ -202,14 +275,16 @@ def test_gitignore_setup():
             'desktop.ini'
         ]
         
-        found_entries = []
+        required_entries = 3
+        found_entries = _find_needles('.gitignore', ntfs_entries,
+                                      stop_after=None if VERBOSE else required_entries)
+        
         for entry in ntfs_entries:
-            if entry in gitignore_content:
-                found_entries.append(entry)
-                print(f"✅ Found .gitignore entry: {entry}")
+            if entry in found_entries:
+                log(f"✅ Found .gitignore entry: {entry}")
         
-        if len(found_entries) >= 3:
-            print("✅ .gitignore has good NTFS compatibility entries")
+        if len(found_entries) >= required_entries:
+            log("✅ .gitignore has good NTFS compatibility entries")
             return True
         else:
             print("⚠️ .gitignore could use more NTFS compatibility entries")
@@ -219,36 +294,116 @@ def test_gitignore_setup():
         print(f"❌ Error checking .gitignore: {e}")
         return False
 
-def test_build_compatibility():
-    """Test build process compatibility"""
-    print("\n🧪 Testing Build Compatibility...")
+TS_BUILD_SENTINEL = os.path.join('.next', 'cache', 'build-ts-ok')
+TS_CHECK_SENTINEL = os.path.join('.next', 'cache', 'check-ts-ok')
+TS_BUILD_INPUTS = ('tsconfig.json', 'package.json', 'package-lock.json')
+TS_SCAN_SKIP_DIRS = {'node_modules', '.next', '.git', 'dist', 'build'}
+
+def _newest_ts_mtime(root: str = '.') -> float:
+    """Return the newest mtime among *.ts/*.tsx files under root"""
+    newest = 0.0
+    stack = [root]
     
-    # Test TypeScript compilation first
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in TS_SCAN_SKIP_DIRS:
+                        stack.append(entry.path)
+                elif entry.name.endswith(('.ts', '.tsx')):
+                    newest = max(newest, entry.stat().st_mtime)
+    
+    return newest
+
+def _run_ts_command(command: List[str], timeout: int) -> bool:
+    """Run a TypeScript build command and report the outcome"""
     try:
-        print("🔨 Testing TypeScript compilation...")
-        
-        result = subprocess.run(['npm', 'run', 'build:ts'], 
-                              capture_output=True, text=True, timeout=60)
+        # Only stderr is ever reported, so don't buffer the (large) build stdout
+        result = subprocess.run(command, 
+                              stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                              text=True, timeout=timeout)
         
         if result.returncode == 0:
-            print("✅ TypeScript compilation successful")
-            ts_success = True
+            log("✅ TypeScript compilation successful")
+            return True
         else:
             print("❌ TypeScript compilation failed")
             print("STDERR:", result.stderr[:200])
-            ts_success = False
+            return False
             
     except subprocess.TimeoutExpired:
         print("❌ TypeScript compilation timed out")
-        ts_success = False
+        return False
     except Exception as e:
         print(f"❌ TypeScript compilation error: {e}")
-        ts_success = False
+        return False
+
+def _ts_sentinel_fresh(sentinel: str) -> bool:
+    """True when the sentinel is newer than every *.ts file and TS_BUILD_INPUTS"""
+    inputs_mtime = max(
+        [_newest_ts_mtime('.')] +
+        [os.stat(name).st_mtime for name in TS_BUILD_INPUTS if name in _root_names()]
+    )
+    try:
+        return os.stat(sentinel).st_mtime >= inputs_mtime
+    except FileNotFoundError:
+        return False
+
+def _touch_sentinel(sentinel: str):
+    """Record a successful TypeScript run"""
+    os.makedirs(os.path.dirname(sentinel), exist_ok=True)
+    Path(sentinel).touch()
+
+def _check_ts() -> bool:
+    """Check TypeScript, running the full build only when TRAFFIC_ROUTER_FULL_BUILD=1"""
+    if os.environ.get("TRAFFIC_ROUTER_FULL_BUILD") == "1":
+        log("🔨 Testing TypeScript compilation (full build)...")
+        
+        # Skip the rebuild when nothing changed since the last successful one
+        if _ts_sentinel_fresh(TS_BUILD_SENTINEL):
+            log("✅ TypeScript build is up to date")
+            return True
+        
+        if not _run_ts_command(['npm', 'run', 'build:ts'], timeout=60):
+            return False
+        
+        _touch_sentinel(TS_BUILD_SENTINEL)
+        return True
+    
+    log("🔨 Testing TypeScript configuration...")
+    
+    if 'tsconfig.json' not in _root_names():
+        print("❌ tsconfig.json not found")
+        return False
+    
+    # tsbuildinfo is rewritten even when tsc reports errors, so only a
+    # sentinel touched after a clean check can skip the next one
+    if _ts_sentinel_fresh(TS_CHECK_SENTINEL):
+        log("✅ TypeScript check is up to date")
+        return True
+    
+    if not _run_ts_command(['npx', 'tsc', '--noEmit', '--incremental'], timeout=60):
+        return False
+    
+    _touch_sentinel(TS_CHECK_SENTINEL)
+    return True
+
+def test_build_compatibility():
+    """Test build process compatibility"""
+    log("\n🧪 Testing Build Compatibility...")
+    
+    # Test TypeScript compilation first
+    ts_success = _check_ts()
     
     # Test if NTFS build script exists and is executable
     ntfs_build_script = "scripts/build-ntfs-fix.sh"
-    if os.path.exists(ntfs_build_script) and os.access(ntfs_build_script, os.X_OK):
-        print("✅ NTFS build script is available and executable")
+    try:
+        script_mode = os.stat(ntfs_build_script).st_mode
+    except OSError:
+        script_mode = 0
+    
+    if stat.S_ISREG(script_mode) and script_mode & stat.S_IXUSR:
+        log("✅ NTFS build script is available and executable")
         ntfs_script_ok = True
     else:
         print("❌ NTFS build script is not available or not executable")
@@ -258,7 +413,7 @@ def test_build_compatibility():
 
 def test_directory_structure():
     """Test directory structure and permissions"""
-    print("\n🧪 Testing Directory Structure...")
+    log("\n🧪 Testing Directory Structure...")
     
     required_dirs = [
         'scripts',
@@ -276,23 +431,25 @@ def test_directory_structure():
     ]
     
     success_count = 0
+    root_dirs = {name: entry.is_dir() for name, entry in _scan_dir('.').items()}
     
     # Check required directories
     for dir_name in required_dirs:
-        if os.path.exists(dir_name) and os.path.isdir(dir_name):
-            print(f"✅ Required directory exists: {dir_name}")
+        if root_dirs.get(dir_name, False):
+            log(f"✅ Required directory exists: {dir_name}")
             success_count += 1
         else:
             print(f"❌ Required directory missing: {dir_name}")
     
     # Check optional directories (create if missing)
     for dir_name in optional_dirs:
-        if os.path.exists(dir_name):
-            print(f"✅ Optional directory exists: {dir_name}")
+        if dir_name in root_dirs:
+            log(f"✅ Optional directory exists: {dir_name}")
         else:
             try:
                 os.makedirs(dir_name, exist_ok=True)
-                print(f"✅ Created optional directory: {dir_name}")
+                _root_names.cache_clear()
+                log(f"✅ Created optional directory: {dir_name}")
             except Exception as e:
                 print(f"⚠️ Could not create directory {dir_name}: {e}")
     
@@ -302,19 +459,24 @@ def main():
     """Run all NTFS fixes tests"""
     print("🚀 Starting NTFS/fuseblk Fixes Tests...\n")
     
-    test_results = []
-    
-    # Run all tests
-    fs_success, fs_type = test_filesystem_detection()
-    test_results.append(("Filesystem Detection", fs_success))
+    tests = [
+        ("Script Permissions", test_script_permissions),
+        ("NPM Scripts", test_npm_scripts),
+        ("Next.js Configuration", test_next_config),
+        ("Environment Setup", test_environment_setup),
+        ("Gitignore Setup", test_gitignore_setup),
+        ("Build Compatibility", test_build_compatibility),
+        ("Directory Structure", test_directory_structure),
+    ]
     
-    test_results.append(("Script Permissions", test_script_permissions()))
-    test_results.append(("NPM Scripts", test_npm_scripts()))
-    test_results.append(("Next.js Configuration", test_next_config()))
-    test_results.append(("Environment Setup", test_environment_setup()))
-    test_results.append(("Gitignore Setup", test_gitignore_setup()))
-    test_results.append(("Build Compatibility", test_build_compatibility()))
-    test_results.append(("Directory Structure", test_directory_structure()))
+    # Run all tests concurrently: they are independent and bound by stat/read/subprocess
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        fs_future = pool.submit(test_filesystem_detection)
+        futures = [(test_name, pool.submit(test_func)) for test_name, test_func in tests]
+        
+        fs_success, fs_type = fs_future.result()
+        test_results = [("Filesystem Detection", fs_success)]
+        test_results.extend((test_name, future.result()) for test_name, future in futures)
     
     # Summary
     passed_tests = sum(1 for _, result in test_results if result)
@@ -340,6 +502,8 @@ def main():
         print("\n🔧 Recommended actions:")
         print("   npm run fix:permissions  - Fix permission issues")
         print("   Check the failed tests above for specific issues")
+        if not VERBOSE:
+            print("   Re-run with TRAFFIC_ROUTER_TEST_VERBOSE=1 for per-check details")
         return 1
 
 if __name__ == "__main__":
@@ -5,35 +5,155 @@ Test Suite for Enhanced Recovery Agent
 """
 
 import asyncio
+import functools
 import sys
 import os
 import json
-import tempfile
-import shutil
+import re
 import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
 import logging
 from typing import Dict, List, Any, Optional
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# PyYAML импортируется лениво: по умолчанию конфиги проверяются без разбора YAML
+_yaml = None
+_YamlLoader = None
+
+def _get_yaml():
+    """Импорт PyYAML при первом использовании (C-загрузчик при наличии)"""
+    global _yaml, _YamlLoader
+    if _yaml is None:
+        import yaml
+        try:
+            from yaml import CSafeLoader as loader
+        except ImportError:
+            from yaml import SafeLoader as loader
+        _YamlLoader = loader
+        _yaml = yaml
+    return _yaml
+
 # Add project root to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-# Configure logging for tests
-logging.basicConfig(
-    level=logging.WARNING,  # Reduce noise during tests
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+def configure_logging():
+    """Настройка логирования для запуска набора тестов (не выполняется при импорте)"""
+    if os.environ.get('TESTSUITE_QUIET'):
+        root_logger = logging.getLogger()
+        root_logger.addHandler(logging.NullHandler())
+        root_logger.setLevel(logging.CRITICAL + 1)
+    else:
+        logging.basicConfig(
+            level=logging.WARNING,  # Reduce noise during tests
+            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        )
+
+PROJECT_DIRS = ('agents', 'lib', 'server', 'config')
+RESULTS_DIR = 'test_results'
+
+# Пути создаются один раз и интернируются: их сравнивают с путями из _project_files()
+REQUIRED_FILES = tuple(sys.intern(path) for path in (
+    "agents/enhanced_recovery_agent_v2.py",
+    "lib/mcp-ai-agent-integration.py",
+    "lib/memory-manager.py",
+    "lib/session-manager.py",
+    "server/memory-mcp-server.py",
+    "server/session-mcp-server.py",
+    "config/memory-config.yaml",
+    "config/session-config.yaml",
+))
+
+SYNTAX_CHECK_FILES = tuple(sys.intern(path) for path in (
+    "agents/enhanced_recovery_agent_v2.py",
+    "agents/enhanced_recovery_agent_v2_clean.py",
+    "lib/mcp-ai-agent-integration.py",
+    "lib/memory-manager.py",
+    "lib/session-manager.py",
+    "server/memory-mcp-server.py",
+    "server/session-mcp-server.py",
+))
+
+# Обязательный ключ верхнего уровня для каждого конфига
+CONFIG_TOP_KEYS = {
+    'config/memory-config.yaml': 'memory',
+    'config/session-config.yaml': 'sessions',
+}
+_TOP_KEY_PATTERNS = {
+    path: re.compile(rb'^' + re.escape(key.encode()) + rb':', re.M)
+    for path, key in CONFIG_TOP_KEYS.items()
+}
+
+# Файлы, успешно прошедшие проверку синтаксиса: path -> "path:mtime_ns:size"
+SYNTAX_CACHE_PATH = Path('.pytest_cache') / 'test_suite_syntax.json'
+
+# Полный разбор YAML только по запросу (STRICT_YAML=1)
+STRICT_YAML = os.environ.get('STRICT_YAML') == '1'
+
+@functools.lru_cache(maxsize=None)
+def _project_files() -> frozenset:
+    """Относительные пути записей PROJECT_DIRS: один os.scandir на директорию"""
+    present = set()
+    for directory in PROJECT_DIRS:
+        try:
+            with os.scandir(directory) as it:
+                present.update(f"{directory}/{entry.name}" for entry in it)
+        except FileNotFoundError:
+            pass
+    return frozenset(present)
+
+@functools.lru_cache(maxsize=32)
+def _load_yaml(path: str, mtime: float) -> Any:
+    """Разбор YAML один раз на пару (path, mtime); C-загрузчик при наличии"""
+    yaml = _get_yaml()
+    with open(path, 'rb') as f:
+        return yaml.load(f, Loader=_YamlLoader)
+
+def _file_key(path: str) -> str:
+    """Ключ кэша синтаксиса: меняется при любом изменении файла или версии интерпретатора"""
+    st = os.stat(path)
+    return f"{sys.implementation.cache_tag}:{path}:{st.st_mtime_ns}:{st.st_size}"
+
+def _load_syntax_cache() -> Dict[str, str]:
+    """Загрузка кэша проверки синтаксиса"""
+    try:
+        return json.loads(SYNTAX_CACHE_PATH.read_bytes())
+    except (OSError, ValueError):
+        return {}
+
+def _save_syntax_cache(cache: Dict[str, str]):
+    """Сохранение кэша проверки синтаксиса"""
+    try:
+        SYNTAX_CACHE_PATH.parent.mkdir(exist_ok=True)
+        SYNTAX_CACHE_PATH.write_text(json.dumps(cache, indent=2), encoding='utf-8')
+    except OSError as e:
+        print(f"Warning: Failed to save syntax cache: {e}")
+
+def _compile_file(path: str) -> str:
+    """Проверка синтаксиса файла (выполняется в процессе-воркере)"""
+    # Bytes go straight to the tokenizer, which decodes UTF-8 itself
+    compile(Path(path).read_bytes(), path, 'exec')
+    return path
 
 class TestResult:
     """Результат выполнения теста"""
-    def __init__(self, name: str, passed: bool, duration: float, error: str = None, details: Dict[str, Any] = None):
+    __slots__ = ('name', 'passed', 'duration', 'duration_ns', 'error', 'details', 'offset_ns')
+    
+    def __init__(self, name: str, passed: bool, duration: float, error: str = None, details: Dict[str, Any] = None,
+                 duration_ns: Optional[int] = None, offset_ns: int = 0):
         self.name = name
         self.passed = passed
         self.duration = duration
+        self.duration_ns = duration_ns if duration_ns is not None else int(duration * 1e9)
         self.error = error
         self.details = details or {}
-        self.timestamp = datetime.now()
+        # Момент завершения относительно начала набора тестов (perf_counter_ns)
+        self.offset_ns = offset_ns
 
 class TestSuite:
     """Основной класс для выполнения всех тестов"""
@@ -42,60 +162,59 @@ class TestSuite:
         self.results: List[TestResult] = []
         self.temp_dirs: List[str] = []
         
+        # Единая точка отсчёта: время результатов вычисляется от неё по perf_counter_ns
+        self._epoch_dt = datetime.now()
+        self._start_ns = time.perf_counter_ns()
+        
     def create_temp_dir(self) -> str:
         """Создание временной директории для тестов"""
+        import tempfile
         temp_dir = tempfile.mkdtemp()
         self.temp_dirs.append(temp_dir)
         return temp_dir
     
     def cleanup_temp_dirs(self):
         """Очистка временных директорий"""
-        for temp_dir in self.temp_dirs:
-            try:
-                shutil.rmtree(temp_dir)
-            except Exception as e:
-                print(f"Warning: Failed to cleanup {temp_dir}: {e}")
+        if self.temp_dirs:
+            import shutil
+            # Удаляем директории параллельно, чтобы перекрыть системные вызовы
+            with ThreadPoolExecutor(max_workers=min(8, len(self.temp_dirs))) as pool:
+                list(pool.map(lambda d: shutil.rmtree(d, ignore_errors=True), self.temp_dirs))
         self.temp_dirs.clear()
     
     async def run_test(self, test_name: str, test_func, *args, **kwargs) -> TestResult:
         """Выполнение отдельного теста с измерением времени"""
         print(f"🧪 Running {test_name}...")
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         
         try:
             result = await test_func(*args, **kwargs)
-            duration = time.time() - start_time
+            end_ns = time.perf_counter_ns()
+            duration_ns = end_ns - start_ns
+            duration = duration_ns / 1e9
             
             if result:
                 print(f"✅ {test_name} passed ({duration:.2f}s)")
-                return TestResult(test_name, True, duration)
+                return TestResult(test_name, True, duration, duration_ns=duration_ns,
+                                  offset_ns=end_ns - self._start_ns)
             else:
                 print(f"❌ {test_name} failed ({duration:.2f}s)")
-                return TestResult(test_name, False, duration, "Test returned False")
+                return TestResult(test_name, False, duration, "Test returned False", duration_ns=duration_ns,
+                                  offset_ns=end_ns - self._start_ns)
                 
         except Exception as e:
-            duration = time.time() - start_time
+            end_ns = time.perf_counter_ns()
+            duration_ns = end_ns - start_ns
+            duration = duration_ns / 1e9
             print(f"❌ {test_name} failed with exception ({duration:.2f}s): {e}")
-            return TestResult(test_name, False, duration, str(e))
+            return TestResult(test_name, False, duration, str(e), duration_ns=duration_ns,
+                                  offset_ns=end_ns - self._start_ns)
     
     async def test_file_structure(self) -> bool:
         """Тест структуры файлов проекта"""
         try:
-            required_files = [
-                "agents/enhanced_recovery_agent_v2.py",
-                "lib/mcp-ai-agent-integration.py",
-                "lib/memory-manager.py",
-                "lib/session-manager.py",
-                "server/memory-mcp-server.py",
-                "server/session-mcp-server.py",
-                "config/memory-config.yaml",
-                "config/session-config.yaml"
-            ]
-            
-            missing_files = []
-            for file_path in required_files:
-                if not os.path.exists(file_path):
-                    missing_files.append(file_path)
+            project_files = await asyncio.to_thread(_project_files)
+            missing_files = [file_path for file_path in REQUIRED_FILES if file_path not in project_files]
             
             if missing_files:
                 print(f"Missing required files: {missing_files}")
@@ -107,30 +226,32 @@ class TestSuite:
             print(f"File structure test error: {e}")
             return False
     
+    @staticmethod
+    def _load_yaml_file(path: str) -> Any:
+        """Чтение и разбор YAML файла (выполняется в отдельном потоке)"""
+        _get_yaml()  # raises ImportError when PyYAML is missing
+        return _load_yaml(path, os.path.getmtime(path))
+    
     async def test_configuration_loading(self) -> bool:
         """Тест загрузки конфигураций"""
         try:
-            # Test memory config
-            memory_config_path = "config/memory-config.yaml"
-            if os.path.exists(memory_config_path):
-                try:
-                    import yaml
-                    with open(memory_config_path, 'r', encoding='utf-8') as f:
-                        memory_config = yaml.safe_load(f)
-                        if not memory_config or 'memory' not in memory_config:
-                            return False
-                except ImportError:
-                    print("PyYAML not available, skipping YAML validation")
+            project_files = await asyncio.to_thread(_project_files)
             
-            # Test session config
-            session_config_path = "config/session-config.yaml"
-            if os.path.exists(session_config_path):
+            for config_path, top_key in CONFIG_TOP_KEYS.items():
+                if config_path not in project_files:
+                    continue
+                
+                if not STRICT_YAML:
+                    # A bytes regex over the raw file is enough to confirm the top-level key
+                    data = await asyncio.to_thread(Path(config_path).read_bytes)
+                    if not _TOP_KEY_PATTERNS[config_path].search(data):
+                        return False
+                    continue
+                
                 try:
-                    import yaml
-                    with open(session_config_path, 'r', encoding='utf-8') as f:
-                        session_config = yaml.safe_load(f)
-                        if not session_config or 'sessions' not in session_config:
-                            return False
+                    config = await asyncio.to_thread(self._load_yaml_file, config_path)
+                    if not config or top_key not in config:
+                        return False
                 except ImportError:
                     print("PyYAML not available, skipping YAML validation")
             
@@ -144,25 +265,40 @@ class TestSuite:
         """Тест импортов и зависимостей"""
         try:
             # Test basic Python syntax by attempting to compile files
-            python_files = [
-                "agents/enhanced_recovery_agent_v2.py",
-                "agents/enhanced_recovery_agent_v2_clean.py",
-                "lib/mcp-ai-agent-integration.py",
-                "lib/memory-manager.py",
-                "lib/session-manager.py",
-                "server/memory-mcp-server.py",
-                "server/session-mcp-server.py"
+            project_files = await asyncio.to_thread(_project_files)
+            existing_files = [py_file for py_file in SYNTAX_CHECK_FILES if py_file in project_files]
+            
+            # Files unchanged since their last successful compile are skipped
+            syntax_cache = await asyncio.to_thread(_load_syntax_cache)
+            file_keys = await asyncio.to_thread(lambda: {py_file: _file_key(py_file) for py_file in existing_files})
+            files_to_compile = [
+                py_file for py_file in existing_files
+                if syntax_cache.get(py_file) != file_keys[py_file]
             ]
             
-            for py_file in python_files:
-                if os.path.exists(py_file):
-                    try:
-                        with open(py_file, 'r', encoding='utf-8') as f:
-                            content = f.read()
-                        compile(content, py_file, 'exec')
-                    except SyntaxError as e:
-                        print(f"Syntax error in {py_file}: {e}")
-                        return False
+            # compile() holds the GIL, so only separate processes give real parallelism
+            outcomes = []
+            if files_to_compile:
+                loop = asyncio.get_running_loop()
+                workers = min(os.cpu_count() or 1, len(files_to_compile))
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    outcomes = await asyncio.gather(
+                        *(loop.run_in_executor(pool, _compile_file, py_file) for py_file in files_to_compile),
+                        return_exceptions=True
+                    )
+            
+            if files_to_compile:
+                for py_file, outcome in zip(files_to_compile, outcomes):
+                    if not isinstance(outcome, BaseException):
+                        syntax_cache[py_file] = file_keys[py_file]
+                await asyncio.to_thread(_save_syntax_cache, syntax_cache)
+            
+            for py_file, outcome in zip(files_to_compile, outcomes):
+                if isinstance(outcome, SyntaxError):
+                    print(f"Syntax error in {py_file}: {outcome}")
+                    return False
+                if isinstance(outcome, BaseException):
+                    raise outcome
             
             return True
             
@@ -181,15 +317,21 @@ class TestSuite:
             ("Configuration Loading", self.test_configuration_loading),
         ]
         
-        # Run all tests
-        for test_name, test_func in tests:
-            result = await self.run_test(test_name, test_func)
-            self.results.append(result)
+        # Run all tests concurrently: they are independent and their blocking I/O runs in threads
+        results = await asyncio.gather(
+            *(self.run_test(test_name, test_func) for test_name, test_func in tests)
+        )
+        self.results.extend(results)
         
         # Generate summary
-        passed_tests = sum(1 for r in self.results if r.passed)
+        # Single pass over the results for both counters
+        passed_tests = 0
+        total_duration_ns = 0
+        for r in self.results:
+            passed_tests += r.passed
+            total_duration_ns += r.duration_ns
         total_tests = len(self.results)
-        total_duration = sum(r.duration for r in self.results)
+        total_duration = total_duration_ns / 1e9
         
         summary = {
             "total_tests": total_tests,
@@ -198,48 +340,64 @@ class TestSuite:
             "success_rate": (passed_tests / total_tests) * 100 if total_tests > 0 else 0,
             "total_duration": total_duration,
             "timestamp": datetime.now().isoformat(),
-            "results": [
-                {
-                    "name": r.name,
-                    "passed": r.passed,
-                    "duration": r.duration,
-                    "error": r.error,
-                    "timestamp": r.timestamp.isoformat()
-                }
-                for r in self.results
-            ]
+            # TestResult objects are serialized directly by _encode_result in save_results
+            "results": list(self.results)
         }
         
         return summary
     
+    def _encode_result(self, obj: Any) -> Dict[str, Any]:
+        """JSON-представление TestResult (default= для сериализатора)"""
+        if isinstance(obj, TestResult):
+            return {
+                "name": obj.name,
+                "passed": obj.passed,
+                "duration": obj.duration,
+                "error": obj.error,
+                "timestamp": (self._epoch_dt + timedelta(microseconds=obj.offset_ns / 1000)).isoformat()
+            }
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+    
     def print_summary(self, summary: Dict[str, Any]):
         """Вывод сводки результатов тестов"""
-        print(f"\n📊 Test Results Summary:")
-        print(f"   Total Tests: {summary['total_tests']}")
-        print(f"   Passed: {summary['passed_tests']} ✅")
-        print(f"   Failed: {summary['failed_tests']} ❌")
-        print(f"   Success Rate: {summary['success_rate']:.1f}%")
-        print(f"   Total Duration: {summary['total_duration']:.2f}s")
+        lines = [
+            "",
+            f"📊 Test Results Summary:",
+            f"   Total Tests: {summary['total_tests']}",
+            f"   Passed: {summary['passed_tests']} ✅",
+            f"   Failed: {summary['failed_tests']} ❌",
+            f"   Success Rate: {summary['success_rate']:.1f}%",
+            f"   Total Duration: {summary['total_duration']:.2f}s",
+        ]
         
         if summary['failed_tests'] > 0:
-            print(f"\n❌ Failed Tests:")
+            lines.append("")
+            lines.append(f"❌ Failed Tests:")
             for result in summary['results']:
-                if not result['passed']:
-                    print(f"   - {result['name']}: {result['error']}")
+                if not result.passed:
+                    lines.append(f"   - {result.name}: {result.error}")
+        
+        lines.append("")
+        lines.append('🎉 All tests passed!' if summary['failed_tests'] == 0 else '⚠️ Some tests failed.')
         
-        print(f"\n{'🎉 All tests passed!' if summary['failed_tests'] == 0 else '⚠️ Some tests failed.'}")
+        # Single write instead of one print() per line
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
     
     def save_results(self, summary: Dict[str, Any], output_file: str = "test_results.json"):
         """Сохранение результатов тестов в файл"""
         try:
             # Ensure results directory exists
-            results_dir = Path("test_results")
-            results_dir.mkdir(exist_ok=True)
+            os.makedirs(RESULTS_DIR, exist_ok=True)
+            output_path = os.path.join(RESULTS_DIR, output_file)
             
-            output_path = results_dir / output_file
-            
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(summary, f, indent=2, ensure_ascii=False)
+            if orjson is not None:
+                data = orjson.dumps(summary, default=self._encode_result,
+                                    option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+            else:
+                data = json.dumps(summary, default=self._encode_result, indent=2, ensure_ascii=False).encode('utf-8')
+            with open(output_path, 'wb') as f:
+                f.write(data)
             
             print(f"\n💾 Test results saved to: {output_path}")
             
@@ -249,6 +407,7 @@ class TestSuite:
     async def cleanup(self):
         """Очистка ресурсов после тестов"""
         self.cleanup_temp_dirs()
+        _project_files.cache_clear()
 
 async def main():
     """Основная функция для запуска тестов"""
@@ -271,5 +430,14 @@ async def main():
         await test_suite.cleanup()
 
 if __name__ == "__main__":
-    exit_code = asyncio.run(main())
+    configure_logging()
+    
+    # uvloop (libuv-based event loop) when installed, the stdlib loop otherwise
+    try:
+        import uvloop
+        runner = uvloop.run
+    except (ImportError, AttributeError):
+        runner = asyncio.run
+    
+    exit_code = runner(main())
     sys.exit(exit_code)
\ No newline at end of file
@@ -9,12 +9,19 @@ import sys
 import os
 import json
 import time
-import threading
+import itertools
+from collections import Counter
+from contextlib import AsyncExitStack
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 import logging
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Add project root to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
@@ -22,12 +29,41 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 logging.basicConfig(level=logging.WARNING)
 logger = logging.getLogger(__name__)
 
+# Общая конфигурация агента для нагрузочного и параллельного тестов
+AGENT_TEST_CONFIG = {
+    "services": [
+        {"name": "test-service", "port": 13000, "endpoint": "/health", "timeout": 5}
+    ],
+    "monitoring": {
+        "interval": 60,
+        "health_check_interval": 120,
+        "recovery_attempts": 2,
+        "cooldown_period": 300
+    }
+}
+
+# Сколько ждать команды, не успевшие завершиться к дедлайну
+STRAGGLER_GRACE_SECONDS = 5
+
+def _count_errors(results: List[Any], error_types: Counter, label: str) -> int:
+    """Подсчёт исключений в результатах asyncio.gather с разбивкой по типам"""
+    errors = [result for result in results if isinstance(result, Exception)]
+    for error in errors:
+        logger.error("%s error: %s", label, error)
+    error_types.update(type(error).__name__ for error in errors)
+    return len(errors)
+
 class StabilityTestSuite:
     """Тесты стабильности системы"""
     
+    # Загруженные модули по (абсолютный путь, mtime)
+    _module_cache: Dict[Any, Any] = {}
+    
     def __init__(self):
         self.test_results = []
         self.temp_dirs = []
+        self._config_cache: Dict[int, str] = {}
+        self._agents: Dict[int, Any] = {}
         
     def create_temp_dir(self) -> str:
         """Создание временной директории"""
@@ -36,117 +72,170 @@ class StabilityTestSuite:
         self.temp_dirs.append(temp_dir)
         return temp_dir
     
-    def cleanup_temp_dirs(self):
+    async def cleanup_temp_dirs(self):
         """Очистка временных директорий"""
         import shutil
-        for temp_dir in self.temp_dirs:
+        # Удаляем директории параллельно в пуле потоков, не блокируя event loop
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(
+            loop.run_in_executor(None, shutil.rmtree, temp_dir, True)
+            for temp_dir in self.temp_dirs
+        ))
+        self.temp_dirs.clear()
+    
+    def _load_class(self, file_rel_path: str, class_name: str):
+        """Загрузка класса из файла проекта (модуль исполняется один раз на версию файла)"""
+        path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', file_rel_path))
+        key = (path, os.path.getmtime(path))
+        module = self._module_cache.get(key)
+        if module is None:
+            import importlib.util
+            module_name = Path(path).stem.replace('-', '_')
+            spec = importlib.util.spec_from_file_location(module_name, path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            self._module_cache[key] = module
+        return getattr(module, class_name)
+    
+    def _write_config(self, config: Dict[str, Any]) -> str:
+        """Запись YAML конфигурации во временный файл (одинаковые конфигурации пишутся один раз)"""
+        key = hash(repr(config))
+        config_file = self._config_cache.get(key)
+        if config_file is None:
+            import tempfile
+            import yaml
+            
+            dumper = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+            config_bytes = yaml.dump(config, Dumper=dumper, default_flow_style=False,
+                                     allow_unicode=True).encode('utf-8')
+            fd, config_file = tempfile.mkstemp(suffix='.yaml')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(config_bytes)
+            self._config_cache[key] = config_file
+        return config_file
+    
+    async def _get_or_create_agent(self, config: Dict[str, Any]):
+        """Агент для заданной конфигурации (создаётся и инициализируется один раз)"""
+        key = hash(repr(config))
+        agent = self._agents.get(key)
+        if agent is None:
+            from agents.enhanced_recovery_agent_v2 import EnhancedRecoveryAgent
+            
+            agent = EnhancedRecoveryAgent(self._write_config(config))
+            await agent.initialize()
+            await asyncio.wait_for(agent.ready(), timeout=10)
+            self._agents[key] = agent
+        else:
+            await self._reset_agent(agent)
+        return agent
+    
+    async def _reset_agent(self, agent):
+        """Сброс сессии общего агента, чтобы тесты не делили контекст"""
+        if agent.session_manager and agent.current_session_id:
+            await agent.session_manager.close_session(agent.current_session_id, "test_reset")
+        agent.current_session_id = None
+    
+    async def _evict_agent(self, agent):
+        """Удаление агента из пула (его состояние больше не считается надёжным)"""
+        for key, cached in list(self._agents.items()):
+            if cached is agent:
+                del self._agents[key]
+        await agent._cleanup()
+    
+    def cleanup_config_files(self):
+        """Удаление временных файлов конфигурации"""
+        for config_file in self._config_cache.values():
             try:
-                shutil.rmtree(temp_dir)
-            except Exception:
+                os.unlink(config_file)
+            except OSError:
                 pass
-        self.temp_dirs.clear()
+        self._config_cache.clear()
     
-    async def test_agent_stability_under_load(self, duration_minutes: int = 2) -> bool:
+    async def test_agent_stability_under_load(self, duration_minutes: int = 2, batch_size: int = 32) -> bool:
         """Тест стабильности агента под нагрузкой"""
         print(f"🧪 Testing Agent Stability Under Load ({duration_minutes} minutes)...")
         
         try:
-            from agents.enhanced_recovery_agent_v2 import EnhancedRecoveryAgent
+            # Shared agent, initialized once per suite
+            agent = await self._get_or_create_agent(AGENT_TEST_CONFIG)
             
-            # Create test configuration
-            test_config = {
-                "services": [
-                    {"name": "test-service", "port": 13000, "endpoint": "/health", "timeout": 5}
-                ],
-                "monitoring": {
-                    "interval": 60,
-                    "health_check_interval": 120,
-                    "recovery_attempts": 2,
-                    "cooldown_period": 300
-                }
-            }
-            
-            import tempfile
-            import yaml
-            
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-                yaml.dump(test_config, f, default_flow_style=False, allow_unicode=True)
-                config_file = f.name
-            
-            try:
-                # Initialize agent
-                agent = EnhancedRecoveryAgent(config_file)
-                await agent.initialize()
-                
-                # Test parameters
-                end_time = time.time() + (duration_minutes * 60)
-                command_count = 0
-                success_count = 0
-                error_count = 0
-                
-                commands = ["help", "status", "session info", "memory", "mcp status"]
-                
-                print(f"   Running continuous load for {duration_minutes} minutes...")
-                
-                while time.time() < end_time:
-                    command = commands[command_count % len(commands)]
-                    
-                    try:
-                        response = await agent.process_command(command, f"stability_user_{command_count}")
-                        if response:
-                            success_count += 1
-                        else:
-                            error_count += 1
-                    except Exception as e:
-                        error_count += 1
-                        logger.error(f"Command error: {e}")
-                    
-                    command_count += 1
-                    
-                    # Small delay to prevent overwhelming
-                    await asyncio.sleep(0.1)
-                
-                # Calculate results
-                success_rate = (success_count / command_count) * 100 if command_count > 0 else 0
-                
-                print(f"   Commands executed: {command_count}")
-                print(f"   Success rate: {success_rate:.1f}%")
-                print(f"   Errors: {error_count}")
-                
-                # Cleanup
-                await agent._cleanup()
-                
-                # Consider test passed if success rate > 90%
-                test_passed = success_rate > 90
-                
-                if test_passed:
-                    print("✅ Agent stability test passed")
-                else:
-                    print("❌ Agent stability test failed - too many errors")
+            # Test parameters
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + (duration_minutes * 60)
+            command_count = 0
+            success_count = 0
+            error_count = 0
+            error_types = Counter()
+            
+            commands = ["help", "status", "session info", "memory", "mcp status"]
+            cmd_iter = itertools.cycle(commands)
+            
+            # One command up front opens the session, so the first concurrent
+            # batch does not race to create a session per command
+            await agent.process_command("help", "stability_warmup")
+            
+            print(f"   Running continuous load for {duration_minutes} minutes...")
+            
+            while (remaining := deadline - loop.time()) > 0:
+                # Issue a batch of commands concurrently instead of one in flight at a time
+                batch = [
+                    asyncio.create_task(agent.process_command(
+                        next(cmd_iter),
+                        f"stability_user_{command_count + i}"
+                    ))
+                    for i in range(batch_size)
+                ]
+                done, pending = await asyncio.wait(batch, timeout=remaining)
                 
-                return test_passed
+                # Commands still running at the deadline get a short grace period
+                # to finish and are not counted; cancelling one mid-command could
+                # leave the shared agent half-updated, so it is evicted instead
+                if pending:
+                    _, stragglers = await asyncio.wait(pending, timeout=STRAGGLER_GRACE_SECONDS)
+                    if stragglers:
+                        for task in stragglers:
+                            task.cancel()
+                        await asyncio.gather(*stragglers, return_exceptions=True)
+                        await self._evict_agent(agent)
                 
-            finally:
-                os.unlink(config_file)
+                responses = [task.exception() or task.result() for task in done]
+                errors = _count_errors(responses, error_types, "Command")
+                empty = sum(1 for response in responses if not response)
+                success_count += len(responses) - errors - empty
+                error_count += errors + empty
                 
+                command_count += len(done)
+            
+            # Calculate results
+            success_rate = (success_count / command_count) * 100 if command_count > 0 else 0
+            
+            print(f"   Commands executed: {command_count}")
+            print(f"   Success rate: {success_rate:.1f}%")
+            print(f"   Errors: {error_count}")
+            if error_types:
+                print(f"   Error types: {dict(error_types)}")
+            
+            # Consider test passed if success rate > 90%
+            test_passed = success_rate > 90
+            
+            if test_passed:
+                print("✅ Agent stability test passed")
+            else:
+                print("❌ Agent stability test failed - too many errors")
+            
+            return test_passed
+            
         except Exception as e:
             print(f"❌ Agent stability test failed: {e}")
             return False
     
-    async def test_memory_system_stability(self, operations_count: int = 500) -> bool:
+    async def test_memory_system_stability(self, operations_count: int = 500, batch_size: int = 25) -> bool:
         """Тест стабильности системы памяти"""
         print(f"🧪 Testing Memory System Stability ({operations_count} operations)...")
         
         try:
             # Import memory manager
-            import importlib.util
-            spec = importlib.util.spec_from_file_location(
-                "memory_manager", 
-                os.path.join(os.path.dirname(__file__), '..', 'lib', 'memory-manager.py')
-            )
-            memory_module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(memory_module)
-            MarkdownMemoryManager = memory_module.MarkdownMemoryManager
+            MarkdownMemoryManager = self._load_class('lib/memory-manager.py', 'MarkdownMemoryManager')
             
             # Create temporary directory
             temp_dir = self.create_temp_dir()
@@ -154,43 +243,48 @@ class StabilityTestSuite:
             
             success_count = 0
             error_count = 0
+            error_types = Counter()
             
             print(f"   Executing {operations_count} memory operations...")
             
-            for i in range(operations_count):
+            def make_operation(i: int):
                 operation_type = i % 4
+                if operation_type == 0:  # Memory update
+                    return memory_manager.update_memory(
+                        entity=f"stability_entity_{i % 50}",
+                        content=f"Stability test entry {i}",
+                        memory_type="fact",
+                        tags=["stability_test"],
+                        importance=1
+                    )
+                elif operation_type == 1:  # Memory search
+                    return memory_manager.search_memory("stability", limit=10)
+                elif operation_type == 2:  # Memory stats
+                    return memory_manager.get_memory_stats()
+                else:  # Update different entity
+                    return memory_manager.update_memory(
+                        entity=f"shared_entity_{i % 10}",
+                        content=f"Shared stability entry {i}",
+                        memory_type="observation",
+                        tags=["shared", "stability"],
+                        importance=2
+                    )
+            
+            for batch_start in range(0, operations_count, batch_size):
+                batch_indices = range(batch_start, min(batch_start + batch_size, operations_count))
+                results = await asyncio.gather(
+                    *(make_operation(i) for i in batch_indices),
+                    return_exceptions=True
+                )
                 
-                try:
-                    if operation_type == 0:  # Memory update
-                        await memory_manager.update_memory(
-                            entity=f"stability_entity_{i % 50}",
-                            content=f"Stability test entry {i}",
-                            memory_type="fact",
-                            tags=["stability_test"],
-                            importance=1
-                        )
-                    elif operation_type == 1:  # Memory search
-                        await memory_manager.search_memory("stability", limit=10)
-                    elif operation_type == 2:  # Memory stats
-                        await memory_manager.get_memory_stats()
-                    else:  # Update different entity
-                        await memory_manager.update_memory(
-                            entity=f"shared_entity_{i % 10}",
-                            content=f"Shared stability entry {i}",
-                            memory_type="observation",
-                            tags=["shared", "stability"],
-                            importance=2
-                        )
-                    
-                    success_count += 1
-                    
-                except Exception as e:
-                    error_count += 1
-                    logger.error(f"Memory operation {i} error: {e}")
+                errors = _count_errors(results, error_types, "Memory operation")
+                error_count += errors
+                success_count += len(results) - errors
                 
                 # Progress indicator
-                if i % 100 == 0 and i > 0:
-                    print(f"   Progress: {i}/{operations_count} operations completed")
+                completed = batch_indices[-1] + 1
+                if completed // 100 > batch_start // 100 and completed < operations_count:
+                    print(f"   Progress: {completed}/{operations_count} operations completed")
             
             # Calculate results
             success_rate = (success_count / operations_count) * 100
@@ -198,6 +292,8 @@ class StabilityTestSuite:
             print(f"   Operations completed: {operations_count}")
             print(f"   Success rate: {success_rate:.1f}%")
             print(f"   Errors: {error_count}")
+            if error_types:
+                print(f"   Error types: {dict(error_types)}")
             
             # Consider test passed if success rate > 95%
             test_passed = success_rate > 95
@@ -213,91 +309,94 @@ class StabilityTestSuite:
             print(f"❌ Memory system stability test failed: {e}")
             return False
     
-    async def test_session_system_stability(self, sessions_count: int = 50) -> bool:
+    async def test_session_system_stability(self, sessions_count: int = 50, concurrency: int = 10) -> bool:
         """Тест стабильности системы сессий"""
         print(f"🧪 Testing Session System Stability ({sessions_count} sessions)...")
         
         try:
             # Import session manager
-            import importlib.util
-            spec = importlib.util.spec_from_file_location(
-                "session_manager", 
-                os.path.join(os.path.dirname(__file__), '..', 'lib', 'session-manager.py')
-            )
-            session_module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(session_module)
-            SessionManager = session_module.SessionManager
+            SessionManager = self._load_class('lib/session-manager.py', 'SessionManager')
             
             # Create temporary directory
             temp_dir = self.create_temp_dir()
             session_manager = SessionManager(temp_dir)
+            await asyncio.wait_for(session_manager.ready(), timeout=10)
             
-            success_count = 0
-            error_count = 0
+            tally = Counter()
+            error_types = Counter()
             created_sessions = []
+            semaphore = asyncio.Semaphore(concurrency)
             
             print(f"   Creating and managing {sessions_count} sessions...")
             
+            async def run_session(i: int):
+                async with semaphore:
+                    try:
+                        # Create session
+                        session_id = await session_manager.create_session(f"stability_user_{i}")
+                    except Exception as e:
+                        tally['error'] += 1
+                        logger.error("Session creation error: %s", e)
+                        return
+                    
+                    if not session_id:
+                        tally['error'] += 1
+                        return
+                    
+                    created_sessions.append(session_id)
+                    tally['success'] += 1
+                    
+                    # Add context entries to session (5 per session)
+                    results = await asyncio.gather(
+                        *(session_manager.add_context_entry(
+                            session_id=session_id,
+                            entry_type="test",
+                            content=f"Stability test context {i}_{j}",
+                            importance=1
+                        ) for j in range(5)),
+                        return_exceptions=True
+                    )
+                    errors = _count_errors(results, error_types, "Context entry")
+                    tally['error'] += errors
+                    tally['success'] += len(results) - errors
+                    
+                    # Get session context
+                    try:
+                        await session_manager.get_session_context(session_id, limit=10)
+                        tally['success'] += 1
+                    except Exception as e:
+                        tally['error'] += 1
+                        logger.error("Get context error: %s", e)
+                    
+                    # Progress indicator
+                    tally['processed'] += 1
+                    if tally['processed'] % 10 == 0 and tally['processed'] < sessions_count:
+                        print(f"   Progress: {tally['processed']}/{sessions_count} sessions processed")
+            
             # Create sessions and perform operations
-            for i in range(sessions_count):
-                try:
-                    # Create session
-                    session_id = await session_manager.create_session(f"stability_user_{i}")
-                    if session_id:
-                        created_sessions.append(session_id)
-                        success_count += 1
-                        
-                        # Add context entries to session
-                        for j in range(5):  # 5 context entries per session
-                            try:
-                                await session_manager.add_context_entry(
-                                    session_id=session_id,
-                                    entry_type="test",
-                                    content=f"Stability test context {i}_{j}",
-                                    importance=1
-                                )
-                                success_count += 1
-                            except Exception as e:
-                                error_count += 1
-                                logger.error(f"Context entry error: {e}")
-                        
-                        # Get session context
-                        try:
-                            await session_manager.get_session_context(session_id, limit=10)
-                            success_count += 1
-                        except Exception as e:
-                            error_count += 1
-                            logger.error(f"Get context error: {e}")
-                    else:
-                        error_count += 1
-                        
-                except Exception as e:
-                    error_count += 1
-                    logger.error(f"Session creation error: {e}")
-                
-                # Progress indicator
-                if i % 10 == 0 and i > 0:
-                    print(f"   Progress: {i}/{sessions_count} sessions processed")
+            await asyncio.gather(*(run_session(i) for i in range(sessions_count)))
             
             # Test search functionality
             try:
                 search_results = await session_manager.search_context(query="stability", limit=20)
                 if search_results:
-                    success_count += 1
+                    tally['success'] += 1
                 else:
-                    error_count += 1
+                    tally['error'] += 1
             except Exception as e:
-                error_count += 1
-                logger.error(f"Search error: {e}")
+                tally['error'] += 1
+                logger.error("Search error: %s", e)
             
             # Calculate results
             total_operations = sessions_count * 7 + 1  # 1 create + 5 add_context + 1 get_context per session + 1 search
-            success_rate = (success_count / total_operations) * 100
+            success_rate = (tally['success'] / total_operations) * 100
             
             print(f"   Sessions created: {len(created_sessions)}")
             print(f"   Total operations: {total_operations}")
             print(f"   Success rate: {success_rate:.1f}%")
-            print(f"   Errors: {error_count}")
+            print(f"   Errors: {tally['error']}")
+            if error_types:
+                print(f"   Error types: {dict(error_types)}")
             
             # Cleanup
             await session_manager.shutdown()
@@ -321,101 +420,101 @@ class StabilityTestSuite:
         print(f"🧪 Testing Concurrent Operations Stability ({concurrent_tasks} concurrent tasks)...")
         
         try:
-            from agents.enhanced_recovery_agent_v2 import EnhancedRecoveryAgent
+            # Shared agent, initialized once per suite
+            agent = await self._get_or_create_agent(AGENT_TEST_CONFIG)
+            
+            async def concurrent_task(task_id: int):
+                """Параллельная задача"""
+                task_success = 0
+                task_errors = 0
+                
+                cmd_iter = itertools.cycle(["help", "status", "session info", "memory"])
+                
+                for i in range(20):  # 20 commands per task
+                    command = next(cmd_iter)
+                    
+                    try:
+                        response = await agent.process_command(command, f"concurrent_user_{task_id}_{i}")
+                        if response:
+                            task_success += 1
+                        else:
+                            task_errors += 1
+                    except Exception as e:
+                        task_errors += 1
+                        logger.error("Task %s command error: %s", task_id, e)
+                
+                return task_success, task_errors
+            
+            # Run concurrent tasks
+            print(f"   Running {concurrent_tasks} concurrent tasks...")
+            
+            tasks = []
+            for task_id in range(concurrent_tasks):
+                task = asyncio.create_task(concurrent_task(task_id))
+                tasks.append(task)
+            
+            results = await asyncio.gather(*tasks)
+            total_success = sum(success for success, _ in results)
+            total_errors = sum(errors for _, errors in results)
             
+            # Calculate results
+            total_operations = concurrent_tasks * 20
+            success_rate = (total_success / total_operations) * 100 if total_operations > 0 else 0
+            
+            print(f"   Total operations: {total_operations}")
+            print(f"   Success rate: {success_rate:.1f}%")
+            print(f"   Errors: {total_errors}")
+            
+            # Consider test passed if success rate > 85%
+            test_passed = success_rate > 85
+            
+            if test_passed:
+                print("✅ Concurrent operations stability test passed")
+            else:
+                print("❌ Concurrent operations stability test failed - too many errors")
+            
+            return test_passed
+            
+        except Exception as e:
+            print(f"❌ Concurrent operations stability test failed: {e}")
+            return False
+    
+    async def _run_cleanup_cycle(self, agent_class, cycle: int, cycles: int) -> bool:
+        """Один цикл создания и очистки агента"""
+        try:
             # Create test configuration
             test_config = {
                 "services": [
-                    {"name": "test-service", "port": 13000, "endpoint": "/health", "timeout": 3}
+                    {"name": f"test-service-{cycle}", "port": 13000 + cycle, "endpoint": "/health", "timeout": 2}
                 ],
                 "monitoring": {
-                    "interval": 120,
-                    "health_check_interval": 240,
+                    "interval": 300,
+                    "health_check_interval": 600,
                     "recovery_attempts": 1,
-                    "cooldown_period": 600
+                    "cooldown_period": 900
                 }
             }
             
-            import tempfile
-            import yaml
-            
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-                yaml.dump(test_config, f, default_flow_style=False, allow_unicode=True)
-                config_file = f.name
+            config_file = self._write_config(test_config)
             
-            try:
-                # Initialize agent
-                agent = EnhancedRecoveryAgent(config_file)
+            async with AsyncExitStack() as stack:
+                # Initialize agent; cleanup runs even if the cycle fails or is cancelled.
+                # Each cycle gets its own memory/sessions root so parallel cycles
+                # don't race on the same index and session files
+                agent = agent_class(config_file, data_dir=self.create_temp_dir())
+                stack.push_async_callback(agent._cleanup)
                 await agent.initialize()
+                await asyncio.wait_for(agent.ready(), timeout=10)
                 
-                # Shared results
-                results_lock = threading.Lock()
-                total_success = 0
-                total_errors = 0
-                
-                async def concurrent_task(task_id: int):
-                    """Параллельная задача"""
-                    nonlocal total_success, total_errors
-                    
-                    task_success = 0
-                    task_errors = 0
-                    
-                    commands = ["help", "status", "session info", "memory"]
-                    
-                    for i in range(20):  # 20 commands per task
-                        command = commands[i % len(commands)]
-                        
-                        try:
-                            response = await agent.process_command(command, f"concurrent_user_{task_id}_{i}")
-                            if response:
-                                task_success += 1
-                            else:
-                                task_errors += 1
-                        except Exception as e:
-                            task_errors += 1
-                            logger.error(f"Task {task_id} command error: {e}")
-                    
-                    # Update shared results
-                    with results_lock:
-                        total_success += task_success
-                        total_errors += task_errors
-                
-                # Run concurrent tasks
-                print(f"   Running {concurrent_tasks} concurrent tasks...")
-                
-                tasks = []
-                for task_id in range(concurrent_tasks):
-                    task = asyncio.create_task(concurrent_task(task_id))
-                    tasks.append(task)
-                
-                await asyncio.gather(*tasks)
-                
-                # Calculate results
-                total_operations = concurrent_tasks * 20
-                success_rate = (total_success / total_operations) * 100 if total_operations > 0 else 0
-                
-                print(f"   Total operations: {total_operations}")
-                print(f"   Success rate: {success_rate:.1f}%")
-                print(f"   Errors: {total_errors}")
-                
-                # Cleanup
-                await agent._cleanup()
-                
-                # Consider test passed if success rate > 85%
-                test_passed = success_rate > 85
-                
-                if test_passed:
-                    print("✅ Concurrent operations stability test passed")
-                else:
-                    print("❌ Concurrent operations stability test failed - too many errors")
-                
-                return test_passed
-                
-            finally:
-                os.unlink(config_file)
-                
+                # Perform some operations
+                await agent.process_command("help", f"cleanup_test_user_{cycle}")
+                await agent.process_command("status", f"cleanup_test_user_{cycle}")
+            
+            print(f"   Cycle {cycle + 1}/{cycles} completed successfully")
+            return True
+            
         except Exception as e:
-            print(f"❌ Concurrent operations stability test failed: {e}")
+            print(f"   Cycle {cycle + 1}/{cycles} failed: {e}")
             return False
     
     async def test_resource_cleanup_stability(self) -> bool:
@@ -425,52 +524,15 @@ class StabilityTestSuite:
         try:
             from agents.enhanced_recovery_agent_v2 import EnhancedRecoveryAgent
             
-            # Test multiple agent creation and cleanup cycles
+            # Test multiple agent creation and cleanup cycles in parallel
             cycles = 5
-            success_count = 0
             
-            for cycle in range(cycles):
-                try:
-                    # Create test configuration
-                    test_config = {
-                        "services": [
-                            {"name": f"test-service-{cycle}", "port": 13000 + cycle, "endpoint": "/health", "timeout": 2}
-                        ],
-                        "monitoring": {
-                            "interval": 300,
-                            "health_check_interval": 600,
-                            "recovery_attempts": 1,
-                            "cooldown_period": 900
-                        }
-                    }
-                    
-                    import tempfile
-                    import yaml
-                    
-                    with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-                        yaml.dump(test_config, f, default_flow_style=False, allow_unicode=True)
-                        config_file = f.name
-                    
-                    try:
-                        # Initialize agent
-                        agent = EnhancedRecoveryAgent(config_file)
-                        await agent.initialize()
-                        
-                        # Perform some operations
-                        await agent.process_command("help", f"cleanup_test_user_{cycle}")
-                        await agent.process_command("status", f"cleanup_test_user_{cycle}")
-                        
-                        # Cleanup agent
-                        await agent._cleanup()
-                        
-                        success_count += 1
-                        print(f"   Cycle {cycle + 1}/{cycles} completed successfully")
-                        
-                    finally:
-                        os.unlink(config_file)
-                        
-                except Exception as e:
-                    print(f"   Cycle {cycle + 1}/{cycles} failed: {e}")
+            async with asyncio.TaskGroup() as tg:
+                tasks = [
+                    tg.create_task(self._run_cleanup_cycle(EnhancedRecoveryAgent, cycle, cycles))
+                    for cycle in range(cycles)
+                ]
+            success_count = sum(task.result() for task in tasks)
             
             # Calculate results
             success_rate = (success_count / cycles) * 100
@@ -492,47 +554,57 @@ class StabilityTestSuite:
             print(f"❌ Resource cleanup stability test failed: {e}")
             return False
     
+    async def _run_stability_test(self, test_name: str, test_func) -> Dict[str, Any]:
+        """Выполнение одного теста стабильности с замером времени"""
+        test_start = time.perf_counter()
+        try:
+            success = await test_func()
+            duration = time.perf_counter() - test_start
+            print(f"{'✅ PASSED' if success else '❌ FAILED'} - {test_name} ({duration:.2f}s)")
+            return {
+                "name": test_name,
+                "passed": success,
+                "duration": duration,
+                "error": None
+            }
+        except Exception as e:
+            duration = time.perf_counter() - test_start
+            print(f"💥 CRASHED - {test_name} ({duration:.2f}s): {e}")
+            return {
+                "name": test_name,
+                "passed": False,
+                "duration": duration,
+                "error": str(e)
+            }
+    
     async def run_all_stability_tests(self) -> Dict[str, Any]:
         """Выполнение всех тестов стабильности"""
         print("🚀 Starting System Stability Tests...\n")
         
-        start_time = time.time()
+        start_time = time.perf_counter()
         
-        # Define stability tests
-        tests = [
-            ("Agent Stability Under Load", self.test_agent_stability_under_load),
+        # Independent tests (own temp dirs and managers) run concurrently
+        parallel_group = [
             ("Memory System Stability", self.test_memory_system_stability),
             ("Session System Stability", self.test_session_system_stability),
-            ("Concurrent Operations Stability", self.test_concurrent_operations_stability),
             ("Resource Cleanup Stability", self.test_resource_cleanup_stability),
         ]
+        # Agent-heavy tests share the test service port and run one at a time
+        serial_group = [
+            ("Agent Stability Under Load", self.test_agent_stability_under_load),
+            ("Concurrent Operations Stability", self.test_concurrent_operations_stability),
+        ]
         
-        results = []
+        print(f"\n{'='*70}")
+        results = list(await asyncio.gather(
+            *(self._run_stability_test(test_name, test_func) for test_name, test_func in parallel_group)
+        ))
         
-        for test_name, test_func in tests:
+        for test_name, test_func in serial_group:
             print(f"\n{'='*70}")
-            test_start = time.time()
-            try:
-                success = await test_func()
-                duration = time.time() - test_start
-                results.append({
-                    "name": test_name,
-                    "passed": success,
-                    "duration": duration,
-                    "error": None
-                })
-                print(f"{'✅ PASSED' if success else '❌ FAILED'} - {test_name} ({duration:.2f}s)")
-            except Exception as e:
-                duration = time.time() - test_start
-                results.append({
-                    "name": test_name,
-                    "passed": False,
-                    "duration": duration,
-                    "error": str(e)
-                })
-                print(f"💥 CRASHED - {test_name} ({duration:.2f}s): {e}")
+            results.append(await self._run_stability_test(test_name, test_func))
         
-        total_duration = time.time() - start_time
+        total_duration = time.perf_counter() - start_time
         passed_tests = sum(1 for r in results if r["passed"])
         total_tests = len(results)
         
@@ -579,14 +651,23 @@ class StabilityTestSuite:
         
         print(f"="*70)
     
-    def save_stability_results(self, summary: Dict[str, Any]):
+    async def save_stability_results(self, summary: Dict[str, Any]):
         """Сохранение результатов тестов стабильности"""
         try:
             results_dir = Path("test_results")
             results_dir.mkdir(exist_ok=True)
             
-            with open(results_dir / "stability_test_results.json", 'w', encoding='utf-8') as f:
-                json.dump(summary, f, indent=2, ensure_ascii=False)
+            # Отступы только по запросу: по умолчанию результаты читают CI-инструменты
+            pretty = bool(os.environ.get("STABILITY_PRETTY"))
+            if orjson is not None:
+                option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+                data = orjson.dumps(summary, option=option)
+            else:
+                data = json.dumps(summary, indent=2 if pretty else None, ensure_ascii=False).encode('utf-8')
+            # Запись в файл вне event loop
+            await asyncio.get_running_loop().run_in_executor(
+                None, (results_dir / "stability_test_results.json").write_bytes, data
+            )
             
             print(f"\n💾 Stability test results saved to: test_results/stability_test_results.json")
             
@@ -595,7 +676,11 @@ class StabilityTestSuite:
     
     async def cleanup(self):
         """Очистка ресурсов"""
-        self.cleanup_temp_dirs()
+        for agent in self._agents.values():
+            await agent._cleanup()
+        self._agents.clear()
+        await self.cleanup_temp_dirs()
+        self.cleanup_config_files()
 
 async def main():
     """Основная функция для запуска тестов стабильности"""
@@ -609,7 +694,7 @@ async def main():
         test_suite.print_stability_summary(summary)
         
         # Save results
-        test_suite.save_stability_results(summary)
+        await test_suite.save_stability_results(summary)
         
         # Return appropriate exit code
         return 0 if summary['failed_tests'] == 0 else 1
@@ -624,5 +709,12 @@ async def main():
         await test_suite.cleanup()
 
 if __name__ == "__main__":
-    exit_code = asyncio.run(main())
+    # uvloop (libuv-based event loop) when installed, the stdlib loop otherwise
+    try:
+        import uvloop
+        runner = uvloop.run
+    except (ImportError, AttributeError):
+        runner = asyncio.run
+    
+    exit_code = runner(main())
     sys.exit(exit_code)
\ No newline at end of file